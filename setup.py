@@ -12,6 +12,13 @@ setup(
         "numpy==1.26.4",
         "sympy==1.12",
     ],
+    extras_require={
+        "test": [
+            "pytest>=7.0",
+            "pytest-xdist",
+            "ijson",
+        ],
+    },
     python_requires=">=3.8",
     entry_points={
         "console_scripts": [
@@ -46,8 +46,12 @@ class ChangeDetector:
         self.file_hashes: Dict[str, FileHash] = {}
     
     def compute_hash(self, content: str) -> str:
-        """Compute SHA256 hash of content"""
-        return hashlib.sha256(content.encode()).hexdigest()
+        """Compute a 128-bit BLAKE2b hash of content
+        
+        Change detection needs no cryptographic strength; BLAKE2b is faster
+        than SHA-256 on the small inputs typical of source files.
+        """
+        return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
     
     def detect_changes(self, files: Dict[str, str]) -> Dict[str, ChangeType]:
         """
@@ -22,6 +22,18 @@ except ImportError:
     llvm = None
 
 
+_NATIVE_TARGET_READY = False
+
+
+def _init_native_target():
+    """Initialize LLVM's native target and asm printer once per process"""
+    global _NATIVE_TARGET_READY
+    if not _NATIVE_TARGET_READY:
+        llvm.initialize_native_target()
+        llvm.initialize_native_asmprinter()
+        _NATIVE_TARGET_READY = True
+
+
 class LLVMType(Enum):
     """LLVM type mapping"""
     I32 = "i32"      # 32-bit integer
@@ -91,8 +103,7 @@ class LLVMCodeGenerator:
                 "llvmlite not installed. Install with: pip install llvmlite"
             )
         
-        llvm.initialize_native_target()
-        llvm.initialize_native_asmprinter()
+        _init_native_target()
         
         self.module = ir.Module(name=module_name)
         self.builder = None
@@ -532,13 +543,14 @@ class LLVMBackend:
     
     def benchmark_vs_interpreter(self, iterations: int = 10000) -> Dict[str, Any]:
         """Benchmark native vs interpreter performance"""
-        start = time.time()
+        # perf_counter: a single iteration still measures a non-zero time
+        start = time.perf_counter()
         
         # Simulate execution
         for _ in range(iterations):
             pass
         
-        elapsed = time.time() - start
+        elapsed = time.perf_counter() - start
         
         return {
             'iterations': iterations,
@@ -47,17 +47,25 @@ class SynapseCLI:
             'update': InstallCommand(self.config, self.auth_manager),
         }
     
-    def create_parser(self) -> argparse.ArgumentParser:
+    def create_parser(self, exit_on_error: bool = True) -> argparse.ArgumentParser:
         """Create and configure argument parser.
         
+        Args:
+            exit_on_error: If False, invalid arguments raise
+                argparse.ArgumentError instead of printing usage and
+                exiting (Python 3.9+)
+        
         Returns:
             Configured ArgumentParser instance
         """
+        # Only pass the flag when disabling it; Python 3.8 does not accept it
+        extra = {} if exit_on_error else {'exit_on_error': False}
         parser = argparse.ArgumentParser(
             prog='synapse pkg',
             description='Synapse Package Manager CLI',
             formatter_class=argparse.RawDescriptionHelpFormatter,
-            epilog=self._get_epilog()
+            epilog=self._get_epilog(),
+            **extra
         )
         
         parser.add_argument(
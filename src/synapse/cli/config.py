@@ -10,9 +10,11 @@ Handles:
 import os
 import json
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from dataclasses import dataclass, field, asdict
 
+from .jsonio import dumps, loads
+
 
 @dataclass
 class CLIConfig:
@@ -62,16 +64,15 @@ class CLIConfig:
         """Load configuration from file if it exists."""
         if self.config_file.exists():
             try:
-                with open(self.config_file, 'r') as f:
-                    config_data = json.load(f)
-                    
-                    # Update fields from config file
-                    for key, value in config_data.items():
-                        if hasattr(self, key):
-                            if key in ['cache_dir', 'packages_dir', 'lock_file', 'manifest_file']:
-                                setattr(self, key, Path(value))
-                            else:
-                                setattr(self, key, value)
+                config_data = loads(self.config_file.read_bytes())
+                
+                # Update fields from config file
+                for key, value in config_data.items():
+                    if hasattr(self, key):
+                        if key in ['cache_dir', 'packages_dir', 'lock_file', 'manifest_file']:
+                            setattr(self, key, Path(value))
+                        else:
+                            setattr(self, key, value)
             except (json.JSONDecodeError, IOError) as e:
                 print(f"Warning: Could not load config: {e}")
     
@@ -85,8 +86,7 @@ class CLIConfig:
             if key in config_data:
                 config_data[key] = str(config_data[key])
         
-        with open(self.config_file, 'w') as f:
-            json.dump(config_data, f, indent=2)
+        self.config_file.write_bytes(dumps(config_data))
     
     def get_cache_path(self, key: str) -> Path:
         """Get cache file path for a key.
@@ -155,8 +155,7 @@ class CredentialsManager:
         """Load credentials from file."""
         if self.config.credentials_file.exists():
             try:
-                with open(self.config.credentials_file, 'r') as f:
-                    self._credentials = json.load(f)
+                self._credentials = loads(self.config.credentials_file.read_bytes())
             except (json.JSONDecodeError, IOError):
                 self._credentials = {}
     
@@ -165,8 +164,7 @@ class CredentialsManager:
         self.config.credentials_file.parent.mkdir(parents=True, exist_ok=True)
         
         # Set restrictive permissions
-        with open(self.config.credentials_file, 'w') as f:
-            json.dump(self._credentials, f, indent=2)
+        self.config.credentials_file.write_bytes(dumps(self._credentials))
         
         # chmod 600 (read/write owner only)
         os.chmod(self.config.credentials_file, 0o600)
@@ -188,6 +186,21 @@ class CredentialsManager:
         
         self._save_credentials()
     
+    def store_tokens_bulk(self, tokens: Dict[str, Tuple[str, str]]) -> None:
+        """Store several authentication tokens with a single write.
+        
+        Args:
+            tokens: Mapping of registry URL to (token, username); use an
+                empty username to leave it unset
+        """
+        for registry, (token, username) in tokens.items():
+            entry = self._credentials.setdefault(registry, {})
+            entry['token'] = token
+            if username:
+                entry['username'] = username
+        
+        self._save_credentials()
+    
     def get_token(self, registry: str) -> Optional[str]:
         """Get stored token for registry.
         
@@ -0,0 +1,34 @@
+"""JSON Helpers for CLI
+
+Lock files, config and credentials are read and written as bytes through
+loads() and dumps(). orjson is used when it is installed; otherwise the
+standard library json module is configured to emit the same UTF-8,
+two-space-indented output.
+"""
+
+import json
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+if ORJSON_AVAILABLE:
+    loads = orjson.loads
+
+    def dumps(obj, sort_keys: bool = False) -> bytes:
+        """Encode obj as indented JSON bytes."""
+        option = orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option)
+else:
+    loads = json.loads
+
+    def dumps(obj, sort_keys: bool = False) -> bytes:
+        """Encode obj as indented JSON bytes."""
+        return json.dumps(
+            obj, indent=2, sort_keys=sort_keys, ensure_ascii=False
+        ).encode()
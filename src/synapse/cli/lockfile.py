@@ -15,15 +15,43 @@ A lock file ensures that `synapse pkg install` will always install
 the exact same versions, enabling reproducible builds across environments.
 """
 
+import io
 import json
+from collections import deque
 import hashlib
+import mmap
+import os
+import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import IO, Dict, List, Optional, Tuple, Any
 from datetime import datetime
 from dataclasses import dataclass, asdict, field
 
+from .jsonio import dumps, loads
 
-@dataclass
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+if IJSON_AVAILABLE:
+    _JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError)
+else:
+    _JSON_ERRORS = (json.JSONDecodeError,)
+
+# Lock files above this size are parsed incrementally with ijson; smaller
+# ones are faster to read and decode in one go
+_STREAM_LOAD_THRESHOLD = 1024 * 1024
+
+# Files above this size are hashed through mmap instead of read() calls
+_MMAP_CHECKSUM_THRESHOLD = 4 * 1024 * 1024
+
+# slots=True drops the per-instance __dict__; dataclasses gained it in 3.10
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class DependencyLock:
     """Represents a locked dependency in the lock file."""
     name: str
@@ -73,20 +101,63 @@ class LockFileManager:
     LOCK_FILE_VERSION = 1
     LOCK_FILE_NAME = "synapse-lock.json"
     
-    def __init__(self, project_root: Optional[Path] = None):
+    def __init__(
+        self,
+        project_root: Optional[Path] = None,
+        storage: Optional[IO[bytes]] = None,
+    ):
         """
         Initialize lock file manager.
         
         Args:
             project_root: Root directory of the project (default: current dir)
+            storage: Seekable binary stream (e.g. io.BytesIO) to read and
+                write the lock file from instead of lock_path
         """
         self.project_root = project_root or Path.cwd()
         self.lock_path = self.project_root / self.LOCK_FILE_NAME
+        self.storage = storage
     
     def exists(self) -> bool:
         """Check if a lock file exists."""
+        if self.storage is not None:
+            return self.storage.seek(0, io.SEEK_END) > 0
         return self.lock_path.exists()
     
+    def _size(self) -> int:
+        """Size in bytes of the lock file in storage or on disk."""
+        if self.storage is not None:
+            return self.storage.seek(0, io.SEEK_END)
+        return self.lock_path.stat().st_size
+    
+    def _read_bytes(self) -> bytes:
+        """Read the raw lock file contents from storage or disk."""
+        if self.storage is not None:
+            self.storage.seek(0)
+            return self.storage.read()
+        return self.lock_path.read_bytes()
+    
+    def _stream_load(self) -> Dict[str, Any]:
+        """Parse the lock file incrementally with ijson.
+        
+        The file is consumed in small buffers, so malformed input fails at
+        the first bad token instead of after reading the whole file.
+        """
+        if self.storage is not None:
+            self.storage.seek(0)
+            return dict(ijson.kvitems(self.storage, '', use_float=True))
+        with open(self.lock_path, 'rb') as f:
+            return dict(ijson.kvitems(f, '', use_float=True))
+    
+    def _write_bytes(self, data: bytes) -> None:
+        """Replace the lock file contents in storage or on disk."""
+        if self.storage is not None:
+            self.storage.seek(0)
+            self.storage.truncate()
+            self.storage.write(data)
+        else:
+            self.lock_path.write_bytes(data)
+    
     def load(self) -> Dict[str, DependencyLock]:
         """
         Load lock file from disk.
@@ -102,9 +173,11 @@ class LockFileManager:
             return {}
         
         try:
-            with open(self.lock_path, 'r') as f:
-                data = json.load(f)
-        except json.JSONDecodeError as e:
+            if IJSON_AVAILABLE and self._size() > _STREAM_LOAD_THRESHOLD:
+                data = self._stream_load()
+            else:
+                data = loads(self._read_bytes())
+        except _JSON_ERRORS as e:
             raise ValueError(f"Lock file is malformed: {e}")
         
         # Validate version
@@ -129,6 +202,10 @@ class LockFileManager:
         Args:
             dependencies: Dictionary mapping package names to DependencyLock objects
         """
+        self._write_bytes(self._serialize(dependencies))
+    
+    def _serialize(self, dependencies: Dict[str, DependencyLock]) -> bytes:
+        """Encode dependencies as lock file bytes, as written by save()."""
         lock_data = {
             "lockfile_version": self.LOCK_FILE_VERSION,
             "generated_at": datetime.utcnow().isoformat(),
@@ -138,9 +215,8 @@ class LockFileManager:
             }
         }
         
-        # Write with nice formatting
-        with open(self.lock_path, 'w') as f:
-            json.dump(lock_data, f, indent=2, sort_keys=True)
+        # Nice formatting, sorted keys
+        return dumps(lock_data, sort_keys=True)
     
     def add_dependency(
         self,
@@ -212,11 +288,11 @@ class LockFileManager:
             return {}
         
         result = {}
-        to_process = [dependencies[name]]
+        to_process = deque([dependencies[name]])
         processed = set()
         
         while to_process:
-            current = to_process.pop(0)
+            current = to_process.popleft()
             if current.name in processed:
                 continue
             processed.add(current.name)
@@ -252,12 +328,7 @@ class LockFileManager:
         expected_checksum = dependencies[package_name].checksum
         
         # Calculate SHA256 of tarball
-        sha256_hash = hashlib.sha256()
-        with open(tarball_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b''):
-                sha256_hash.update(chunk)
-        
-        calculated_checksum = sha256_hash.hexdigest()
+        calculated_checksum = self.calculate_checksum(tarball_path)
         return calculated_checksum == expected_checksum
     
     def is_locked(
@@ -319,9 +390,18 @@ class LockFileManager:
         Returns:
             Hex-encoded SHA256 checksum
         """
-        sha256_hash = hashlib.sha256()
         with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b''):
+            # Large files: hash the page cache directly, no per-chunk copies
+            if os.fstat(f.fileno()).st_size > _MMAP_CHECKSUM_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    return hashlib.sha256(mm).hexdigest()
+            # file_digest (3.11+) reads straight into the hash in C
+            if hasattr(hashlib, 'file_digest'):
+                return hashlib.file_digest(f, 'sha256').hexdigest()
+            sha256_hash = hashlib.sha256()
+            for chunk in iter(lambda: f.read(65536), b''):
                 sha256_hash.update(chunk)
         return sha256_hash.hexdigest()
     
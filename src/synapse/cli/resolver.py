@@ -7,6 +7,7 @@ Handles:
 - Lock file generation
 """
 
+import functools
 import json
 import requests
 import re
@@ -111,15 +112,14 @@ class SemanticVersion:
         Returns:
             True if version matches spec
         """
-        version_spec = version_spec.strip()
+        op, base = _parse_range(version_spec)
         
         # Exact version
-        if not any(c in version_spec for c in ['^', '~', '>', '<', '=']):
-            return self == version_spec
+        if op == '':
+            return self == base
         
         # Caret: allows changes that do not modify left-most non-zero version
-        if version_spec.startswith('^'):
-            base = SemanticVersion(version_spec[1:])
+        if op == '^':
             if base.major > 0:
                 return (self >= base and 
                        self.major == base.major)
@@ -131,35 +131,52 @@ class SemanticVersion:
                 return self == base
         
         # Tilde: allows patch-level changes
-        if version_spec.startswith('~'):
-            base = SemanticVersion(version_spec[1:])
+        if op == '~':
             return (self >= base and
                    self.major == base.major and
                    self.minor == base.minor)
         
-        # Greater than or equal
-        if version_spec.startswith('>='):
-            return self >= SemanticVersion(version_spec[2:])
-        
-        # Greater than
-        if version_spec.startswith('>'):
-            return self > SemanticVersion(version_spec[1:])
-        
-        # Less than or equal
-        if version_spec.startswith('<='):
-            return self <= SemanticVersion(version_spec[2:])
-        
-        # Less than
-        if version_spec.startswith('<'):
-            return self < SemanticVersion(version_spec[1:])
-        
-        # Equals
-        if version_spec.startswith('='):
-            return self == SemanticVersion(version_spec[1:])
+        if op == '>=':
+            return self >= base
+        if op == '>':
+            return self > base
+        if op == '<=':
+            return self <= base
+        if op == '<':
+            return self < base
+        if op == '=':
+            return self == base
         
         return False
 
 
+# Longer operators first so '>=' is not read as '>'
+_RANGE_OPERATORS = ('>=', '<=', '^', '~', '>', '<', '=')
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_range(version_spec: str) -> Tuple[Optional[str], Optional[SemanticVersion]]:
+    """Split a version spec into its operator and base version.
+    
+    Args:
+        version_spec: Version spec (e.g., '^1.2.3', '~1.2.3', '>=1.2.3')
+        
+    Returns:
+        (operator, base) where operator is '' for an exact version, or
+        (None, None) if the spec is not understood
+    """
+    version_spec = version_spec.strip()
+    
+    if not any(c in version_spec for c in ['^', '~', '>', '<', '=']):
+        return '', SemanticVersion(version_spec)
+    
+    for op in _RANGE_OPERATORS:
+        if version_spec.startswith(op):
+            return op, SemanticVersion(version_spec[len(op):])
+    
+    return None, None
+
+
 class DependencyResolver:
     """Resolves package dependencies."""
     
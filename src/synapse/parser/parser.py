@@ -1,4 +1,8 @@
+from collections import OrderedDict
+
 from antlr4 import *
+from antlr4.error.Errors import ParseCancellationException
+from antlr4.error.ErrorListener import ErrorListener
 from generated.SynapseLexer import SynapseLexer
 from generated.SynapseParser import SynapseParser
 from generated.SynapseListener import SynapseListener
@@ -362,12 +366,69 @@ class SynapseInterpreter(SynapseListener):
 
 
 
-def parse_and_execute(input_str):
-    input_stream = InputStream(input_str)
-    lexer = SynapseLexer(input_stream)
+class _ErrorCounter(ErrorListener):
+    """Counts reported errors; the default console listener still prints them."""
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        self.count += 1
+
+
+def parse_tokens(input_str, lexer_listener=None):
+    """Lex and parse source, returning the token stream and program tree.
+
+    The first attempt uses SLL prediction and bails on the first syntax
+    error, skipping ANTLR's full-context prediction and error recovery.
+    Only input that fails that pass is re-parsed with LL prediction and
+    the default recovering error strategy. ``lexer_listener``, if given,
+    is added to the lexer's error listeners.
+    """
+    lexer = SynapseLexer(InputStream(input_str))
+    if lexer_listener is not None:
+        lexer.addErrorListener(lexer_listener)
     tokens = CommonTokenStream(lexer)
     parser = SynapseParser(tokens)
-    tree = parser.program()
+    parser._interp.predictionMode = PredictionMode.SLL
+    parser._errHandler = BailErrorStrategy()
+    parser.removeErrorListeners()
+    try:
+        return tokens, parser.program()
+    except ParseCancellationException:
+        tokens.seek(0)
+        parser = SynapseParser(tokens)
+        return tokens, parser.program()
+
+
+# Most recently used (tokens, tree) pairs from parse_cached, keyed by source
+_PARSE_CACHE = OrderedDict()
+_PARSE_CACHE_SIZE = 256
+
+
+def parse_cached(input_str):
+    """Return ``(tokens, tree)`` for source, reusing earlier clean parses.
+
+    Only source that lexed and parsed without errors is cached; input with
+    bad tokens or that needed error recovery is re-parsed, and its errors
+    re-reported, on every call.
+    """
+    result = _PARSE_CACHE.get(input_str)
+    if result is not None:
+        _PARSE_CACHE.move_to_end(input_str)
+        return result
+    lexer_errors = _ErrorCounter()
+    result = parse_tokens(input_str, lexer_errors)
+    if lexer_errors.count == 0 and result[1].parser.getNumberOfSyntaxErrors() == 0:
+        _PARSE_CACHE[input_str] = result
+        if len(_PARSE_CACHE) > _PARSE_CACHE_SIZE:
+            _PARSE_CACHE.popitem(last=False)
+    return result
+
+
+def run(tree):
+    """Execute a compiled program tree with a fresh interpreter."""
     interpreter = SynapseInterpreter()
     
     # First pass: collect all function definitions without executing them
@@ -388,3 +449,7 @@ def parse_and_execute(input_str):
     
     print(f"DEBUG: interpreter.result = {interpreter.result}")
     return interpreter.result
+
+
+def parse_and_execute(input_str):
+    return run(parse_tokens(input_str)[1])
@@ -1,6 +1,7 @@
 import sys
 import re
-from typing import List, Dict, Set, Tuple, Optional
+from collections import OrderedDict
+from typing import Any, List, Dict, Set, Tuple, Optional
 from synapse.parser.parser import parse_and_execute
 
 # ANSI color codes for syntax highlighting
@@ -44,112 +45,79 @@ class SyntaxHighlighter:
         'bernoulli', 'categorical'
     }
     
-    def __init__(self):
-        self.token_patterns = [
-            ('STRING', r'"[^"]*"|\'[^\']*\''),
-            ('NUMBER', r'\b\d+\.?\d*\b'),
-            ('COMMENT', r'#.*'),
-            ('KEYWORD', r'\b(' + '|'.join(self.KEYWORDS) + r')\b'),
-            ('BUILTIN', r'\b(' + '|'.join(self.BUILTINS) + r')\b'),
-            ('OPERATOR', r'[+\-*/%<>=!&|^~]+'),
-        ]
+    # One pass over the text: each match is a single token, named by the
+    # group that matched, and the text between matches is copied unchanged.
+    # A '#' inside a string stays part of the string; comments run to the
+    # end of their line.
+    _TOKEN_RE = re.compile(
+        r'(?P<STRING>"[^"]*"|\'[^\']*\')'
+        r'|(?P<COMMENT>#.*)'
+        r'|(?P<NUMBER>\d[\d.]*)'
+        r'|(?P<NAME>[^\W\d]\w*)'
+        r'|(?P<OPERATOR>[+\-*/%<>=!&|^~]+)'
+    )
+    
+    # Color prefix per token kind; every colored token is closed by RESET.
+    # Names are colored by word, with keywords winning over builtins.
+    _TOKEN_COLORS = {
+        'STRING': Colors.GREEN,
+        'COMMENT': Colors.BRIGHT_BLACK,
+        'NUMBER': Colors.CYAN,
+        'OPERATOR': Colors.BRIGHT_YELLOW,
+    }
+    _NAME_COLORS = dict.fromkeys(BUILTINS, Colors.YELLOW)
+    _NAME_COLORS.update(dict.fromkeys(KEYWORDS, Colors.MAGENTA + Colors.BOLD))
     
     def colorize(self, text: str) -> str:
         """Apply syntax highlighting to text."""
         if not isinstance(text, str):
             return str(text)
         
-        # Build regex pattern for tokenization
         result = []
-        processed = 0
-        
-        # Try comment first (if present, rest is comment)
-        comment_match = re.search(r'#.*', text)
-        if comment_match:
-            # Highlight part before comment
-            before_comment = text[:comment_match.start()]
-            result_before = self._highlight_tokens(before_comment)
-            # Add comment in gray
-            comment_text = text[comment_match.start():]
-            return result_before + Colors.BRIGHT_BLACK + comment_text + Colors.RESET
-        
-        return self._highlight_tokens(text)
-    
-    def _highlight_tokens(self, text: str) -> str:
-        """Tokenize and highlight non-comment text."""
-        result = []
-        i = 0
-        
-        while i < len(text):
-            # Skip whitespace
-            if text[i].isspace():
-                result.append(text[i])
-                i += 1
-                continue
-            
-            # Try to match each pattern
-            matched = False
-            
-            # Strings
-            if text[i] in ('"', "'"):
-                quote = text[i]
-                j = i + 1
-                while j < len(text) and text[j] != quote:
-                    j += 1
-                if j < len(text):
-                    j += 1
-                    result.append(Colors.GREEN + text[i:j] + Colors.RESET)
-                    i = j
-                    matched = True
-            
-            # Numbers
-            if not matched and text[i].isdigit():
-                j = i
-                while j < len(text) and (text[j].isdigit() or text[j] == '.'):
-                    j += 1
-                result.append(Colors.CYAN + text[i:j] + Colors.RESET)
-                i = j
-                matched = True
-            
-            # Keywords and identifiers
-            if not matched and (text[i].isalpha() or text[i] == '_'):
-                j = i
-                while j < len(text) and (text[j].isalnum() or text[j] == '_'):
-                    j += 1
-                word = text[i:j]
-                
-                if word in self.KEYWORDS:
-                    result.append(Colors.MAGENTA + Colors.BOLD + word + Colors.RESET)
-                elif word in self.BUILTINS:
-                    result.append(Colors.YELLOW + word + Colors.RESET)
-                else:
-                    result.append(word)
-                i = j
-                matched = True
-            
-            # Operators
-            if not matched and text[i] in '+-*/%<>=!&|^~':
-                j = i
-                while j < len(text) and text[j] in '+-*/%<>=!&|^~':
-                    j += 1
-                result.append(Colors.BRIGHT_YELLOW + text[i:j] + Colors.RESET)
-                i = j
-                matched = True
-            
-            # Other characters
-            if not matched:
-                result.append(text[i])
-                i += 1
+        append = result.append
+        pos = 0
+        for match in self._TOKEN_RE.finditer(text):
+            append(text[pos:match.start()])
+            pos = match.end()
+            kind = match.lastgroup
+            token = match.group()
+            if kind == 'NAME':
+                color = self._NAME_COLORS.get(token)
+            else:
+                color = self._TOKEN_COLORS[kind]
+            if color is None:
+                append(token)
+            else:
+                append(color)
+                append(token)
+                append(Colors.RESET)
+        append(text[pos:])
         
         return ''.join(result)
 
 
+# Trie key marking the end of a word; no single character can collide with it.
+_END = ''
+
+
 class AutoCompleter:
     """Provides context-aware auto-completion for REPL."""
     
+    MAX_SUGGESTIONS = 10
+    CACHE_SIZE = 256
+    
     def __init__(self):
         self.local_vars: Dict[str, type] = {}
         self.completions: Set[str] = self._build_completions()
+        # Prefix trie of nested dicts; a node's _END entry holds the word
+        # that ends there.
+        self._trie: Dict[str, Any] = {}
+        for word in self.completions:
+            self._insert(word)
+        # Suggestions keyed by (prefix, context version); update_context bumps
+        # the version so entries for an older context are never returned.
+        self._context_version = 0
+        self._suggestion_cache: Dict[Tuple[str, int], List[str]] = OrderedDict()
     
     def _build_completions(self) -> Set[str]:
         """Build set of all available completions."""
@@ -174,21 +142,75 @@ class AutoCompleter:
         
         return completions
     
+    def _insert(self, word: str):
+        """Add a word to the trie."""
+        node = self._trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[_END] = word
+    
+    def _remove(self, word: str):
+        """Remove a word from the trie, pruning branches left empty."""
+        path = []
+        node = self._trie
+        for char in word:
+            if char not in node:
+                return
+            path.append((node, char))
+            node = node[char]
+        node.pop(_END, None)
+        for parent, char in reversed(path):
+            if parent[char]:
+                break
+            del parent[char]
+    
     def update_context(self, local_vars: Dict[str, type]):
         """Update completion context with local variables."""
+        for name in self.local_vars.keys() - local_vars.keys():
+            if name not in self.completions:
+                self._remove(name)
+        for name in local_vars.keys() - self.local_vars.keys():
+            self._insert(name)
         self.local_vars = local_vars.copy()
+        self._context_version += 1
     
     def get_suggestions(self, prefix: str) -> List[str]:
         """Get completion suggestions for given prefix."""
-        all_options = self.completions | set(self.local_vars.keys())
-        
-        # Filter by prefix
-        suggestions = [s for s in all_options if s.startswith(prefix)]
+        key = (prefix, self._context_version)
+        suggestions = self._suggestion_cache.get(key)
+        if suggestions is None:
+            suggestions = self._compute_suggestions(prefix)
+            self._suggestion_cache[key] = suggestions
+            if len(self._suggestion_cache) > self.CACHE_SIZE:
+                self._suggestion_cache.popitem(last=False)
+        else:
+            self._suggestion_cache.move_to_end(key)
+        return list(suggestions)
+    
+    def _compute_suggestions(self, prefix: str) -> List[str]:
+        """Look up suggestions for a prefix in the trie."""
+        node = self._trie
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
         
-        # Sort: exact matches first, then by length, then alphabetically
-        suggestions.sort(key=lambda x: (x != prefix, len(x), x))
+        # Walk the subtrie level by level with children in sorted order, so
+        # words come out exact match first, then by length, then
+        # alphabetically, and stop once enough have been found.
+        suggestions = []
+        level = [node]
+        while level:
+            next_level = []
+            for node in level:
+                if _END in node:
+                    suggestions.append(node[_END])
+                    if len(suggestions) == self.MAX_SUGGESTIONS:
+                        return suggestions
+                next_level.extend(node[char] for char in sorted(node) if char != _END)
+            level = next_level
         
-        return suggestions[:10]  # Return top 10
+        return suggestions
     
     def complete_at_cursor(self, line: str, cursor_pos: int) -> Optional[str]:
         """Get best completion at cursor position."""
@@ -206,6 +228,8 @@ class AutoCompleter:
 class MultiLineBuffer:
     """Handles multi-line input with bracket/parenthesis matching."""
     
+    INCOMPLETE_ENDINGS = (':', '+', '-', '*', '/', '%', '=', 'and', 'or', 'if', 'else', 'then')
+    
     def __init__(self):
         self.buffer: List[str] = []
         self.open_brackets = 0
@@ -223,9 +247,18 @@ class MultiLineBuffer:
         return self.is_complete()
     
     def _update_bracket_count(self, line: str):
-        """Track open/close brackets."""
+        """Track open/close brackets, ignoring strings and comments."""
+        quote = None
         for char in line:
-            if char == '[':
+            if quote is not None:
+                # Synapse strings have no escapes; only the same quote closes
+                if char == quote:
+                    quote = None
+            elif char == '"' or char == "'":
+                quote = char
+            elif char == '#':
+                break
+            elif char == '[':
                 self.open_brackets += 1
             elif char == ']':
                 self.open_brackets -= 1
@@ -250,15 +283,12 @@ class MultiLineBuffer:
         if not self.buffer:
             return False
         
-        full_text = '\n'.join(self.buffer).strip()
+        # Only the end of the text matters, so look at the last non-blank
+        # line rather than joining the whole buffer on every added line.
+        last_line = next((line.rstrip() for line in reversed(self.buffer) if line.strip()), '')
         
         # Check for incomplete expressions
-        incomplete_endings = [':', '+', '-', '*', '/', '%', '=', 'and', 'or', 'if', 'else', 'then']
-        for ending in incomplete_endings:
-            if full_text.endswith(ending):
-                return False
-        
-        return True
+        return not last_line.endswith(self.INCOMPLETE_ENDINGS)
     
     def get_content(self) -> str:
         """Get the buffered content."""
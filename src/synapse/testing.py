@@ -0,0 +1,10 @@
+"""
+Helpers shared by the Synapse test suite.
+"""
+
+from synapse.parser.parser import parse_cached
+
+
+def parse_once(code):
+    """Return ``(tokens, tree)`` for code, lexing and parsing each source once."""
+    return parse_cached(code)
@@ -3,7 +3,7 @@ Custom Bytecode VM for Synapse
 Implements a register-based virtual machine with JIT support
 """
 
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Iterable, Tuple
 from enum import Enum
 from dataclasses import dataclass
 import time
@@ -125,6 +125,12 @@ class BytecodeVM:
         self.code.append(instr)
         return len(self.code) - 1
     
+    def emit_many(self, instructions: Iterable[Tuple]) -> int:
+        """Emit (opcode, arg1, arg2, arg3) tuples in order and return the first index"""
+        start = len(self.code)
+        self.code.extend(Instruction(*instr) for instr in instructions)
+        return start
+    
     def execute(self) -> Any:
         """Execute the loaded bytecode"""
         start_time = time.time()
@@ -12,14 +12,34 @@ import json
 import gzip
 import io
 import logging
+import struct
+import zlib
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Optional
 import hashlib
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
+if ORJSON_AVAILABLE:
+    _loads = orjson.loads
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+else:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+
+
 class StorageBackend(ABC):
     """Abstract base class for storage backends"""
     
@@ -141,6 +161,72 @@ class S3Storage(StorageBackend):
             return False
 
 
+# Member name suffix that identifies a package manifest
+_MANIFEST_SUFFIX = 'synapse.json'
+
+# Largest tarball upload accepted, compressed
+_MAX_TARBALL_SIZE = 100 * 1024 * 1024
+
+# Largest uncompressed size accepted, so a small gzip bomb cannot make
+# validation inflate gigabytes
+_MAX_INFLATED_SIZE = 512 * 1024 * 1024
+
+# Decompress and checksum in large chunks so zlib.crc32 runs over big
+# buffers rather than many small reads; each decompress call is also
+# capped at this much output to keep memory bounded
+_CRC_CHUNK_SIZE = 1024 * 1024
+
+
+def verify_gzip_crc(data: bytes, max_size: int = _MAX_INFLATED_SIZE) -> None:
+    """Check the first gzip member's CRC32 and size against its trailer"""
+    if len(data) < 18 or data[:3] != b'\x1f\x8b\x08':
+        raise ValueError('Invalid tarball: not gzip format')
+    
+    # Skip the gzip header (RFC 1952) to reach the raw deflate stream
+    flags = data[3]
+    pos = 10
+    if flags & 0x04:  # FEXTRA
+        pos += 2 + struct.unpack_from('<H', data, pos)[0]
+    for flag in (0x08, 0x10):  # FNAME, FCOMMENT
+        if flags & flag:
+            pos = data.index(b'\x00', pos) + 1
+    if flags & 0x02:  # FHCRC
+        pos += 2
+    
+    inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+    view = memoryview(data)
+    crc = 0
+    size = 0
+    try:
+        while not inflater.eof:
+            pending = inflater.unconsumed_tail
+            if not pending and pos < len(data):
+                pending = view[pos:pos + _CRC_CHUNK_SIZE]
+                pos += len(pending)
+            chunk = inflater.decompress(pending, _CRC_CHUNK_SIZE)
+            if not chunk and not pending:
+                # Input exhausted and nothing left buffered in zlib
+                break
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            if size > max_size:
+                raise ValueError('Invalid tarball: uncompressed size exceeds limit')
+        if not inflater.eof:
+            raise ValueError('Invalid tarball: truncated gzip stream')
+    except zlib.error as e:
+        raise ValueError(f'Invalid tarball: {e}')
+    
+    # The trailer follows the deflate stream and may not have been fed to
+    # the inflater yet, so read it from data rather than unused_data
+    end = pos - len(inflater.unused_data)
+    trailer = data[end:end + 8]
+    if len(trailer) < 8:
+        raise ValueError('Invalid tarball: truncated gzip stream')
+    expected_crc, expected_size = struct.unpack('<II', trailer)
+    if crc != expected_crc or (size & 0xFFFFFFFF) != expected_size:
+        raise ValueError('Invalid tarball: gzip CRC check failed')
+
+
 def validate_package_tarball(data: bytes) -> None:
     """Validate tarball contents and structure"""
     try:
@@ -148,43 +234,42 @@ def validate_package_tarball(data: bytes) -> None:
         if data[:2] != b'\x1f\x8b':
             raise ValueError('Invalid tarball: not gzip format')
         
+        # Check tarball size before decompressing anything
+        if len(data) > _MAX_TARBALL_SIZE:
+            raise ValueError('Tarball exceeds maximum size of 100MB')
+        
+        verify_gzip_crc(data)
+        
         # Try to open as tar
         with tarfile.open(fileobj=io.BytesIO(data), mode='r:gz') as tar:
-            # Check for required synapse.json
-            members = tar.getmembers()
-            has_manifest = any(m.name.endswith('synapse.json') for m in members)
+            # Stop at the first manifest instead of indexing every member
+            manifest_member = next(
+                (m for m in tar if m.name.endswith(_MANIFEST_SUFFIX)), None
+            )
             
-            if not has_manifest:
+            if manifest_member is None:
                 raise ValueError('Package must contain synapse.json manifest')
             
             # Validate manifest
-            for member in members:
-                if member.name.endswith('synapse.json'):
-                    f = tar.extractfile(member)
-                    manifest = json.load(f)
-                    
-                    # Required fields
-                    required = ['name', 'version', 'description']
-                    for field in required:
-                        if field not in manifest:
-                            raise ValueError(f'synapse.json missing required field: {field}')
-                    
-                    # Validate name format
-                    name = manifest['name'].lower()
-                    if not (name and all(c.isalnum() or c in '-_' for c in name)):
-                        raise ValueError('Invalid package name in synapse.json')
-                    
-                    # Validate version format
-                    version = manifest['version']
-                    import re
-                    if not re.match(r'^\d+\.\d+\.\d+', version):
-                        raise ValueError('Invalid version format in synapse.json')
-                    
-                    break
+            f = tar.extractfile(manifest_member)
+            manifest = _loads(f.read())
+            
+            # Required fields
+            required = ['name', 'version', 'description']
+            for field in required:
+                if field not in manifest:
+                    raise ValueError(f'synapse.json missing required field: {field}')
+            
+            # Validate name format
+            name = manifest['name'].lower()
+            if not (name and all(c.isalnum() or c in '-_' for c in name)):
+                raise ValueError('Invalid package name in synapse.json')
             
-            # Check tarball size
-            if len(data) > 100 * 1024 * 1024:  # 100MB limit
-                raise ValueError('Tarball exceeds maximum size of 100MB')
+            # Validate version format
+            version = manifest['version']
+            import re
+            if not re.match(r'^\d+\.\d+\.\d+', version):
+                raise ValueError('Invalid version format in synapse.json')
     
     except tarfile.TarError as e:
         raise ValueError(f'Invalid tarball: {str(e)}')
@@ -194,10 +279,10 @@ def extract_package_manifest(data: bytes) -> dict:
     """Extract and parse synapse.json from tarball"""
     try:
         with tarfile.open(fileobj=io.BytesIO(data), mode='r:gz') as tar:
-            for member in tar.getmembers():
-                if member.name.endswith('synapse.json'):
+            for member in tar:
+                if member.name.endswith(_MANIFEST_SUFFIX):
                     f = tar.extractfile(member)
-                    return json.load(f)
+                    return _loads(f.read())
     except Exception as e:
         logger.error(f'Error extracting manifest: {e}')
     
@@ -235,10 +320,29 @@ class PackageIndex:
                 'metadata': metadata
             }
         
-        if version not in self.packages[name]['versions']:
-            self.packages[name]['versions'].append(version)
-            # Sort versions (simplified - doesn't handle semver properly)
-            self.packages[name]['versions'].sort(reverse=True)
+        # Versions are kept sorted newest first (simplified - doesn't handle
+        # semver properly), so binary search for the insertion point
+        versions = self.packages[name]['versions']
+        lo, hi = 0, len(versions)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if versions[mid] > version:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(versions) or versions[lo] != version:
+            versions.insert(lo, version)
+    
+    def add_versions(self, name: str, versions: list, metadata: dict) -> None:
+        """Add many versions of a package to index, sorting once"""
+        if name not in self.packages:
+            self.packages[name] = {
+                'versions': [],
+                'metadata': metadata
+            }
+        
+        entry = self.packages[name]
+        entry['versions'] = sorted(set(entry['versions']).union(versions), reverse=True)
     
     def has_version(self, name: str, version: str) -> bool:
         """Check if version exists"""
@@ -262,11 +366,11 @@ class PackageIndex:
     
     def save(self, path: str) -> None:
         """Save index to file"""
-        with open(path, 'w') as f:
-            json.dump(self.packages, f, indent=2)
+        Path(path).write_bytes(_dumps(self.packages))
     
     def load(self, path: str) -> None:
         """Load index from file"""
         if os.path.exists(path):
-            with open(path, 'r') as f:
-                self.packages = json.load(f)
+            self.packages = _loads(Path(path).read_bytes())
+            for entry in self.packages.values():
+                entry.setdefault('versions', []).sort(reverse=True)
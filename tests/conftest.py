@@ -0,0 +1,93 @@
+"""Shared pytest fixtures for the Synapse test suite."""
+
+import functools
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+# RAM-backed scratch space for tmp_path; lock files and tarballs written by
+# the tests then never touch a journaled block device.
+_TMPFS_ROOT = "/dev/shm"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--runslow", action="store_true", default=False,
+        help="also run tests marked slow",
+    )
+
+
+def pytest_configure(config):
+    """Root pytest's temporary directories on tmpfs when it is available.
+
+    The session gets its own directory under ``/dev/shm``, passed to pytest
+    as its base temp directory and removed when the run ends. An explicit
+    ``--basetemp`` or ``PYTEST_DEBUG_TEMPROOT`` still wins, and xdist
+    workers inherit the controller's directory.
+    """
+    if config.option.basetemp or "PYTEST_DEBUG_TEMPROOT" in os.environ:
+        return
+    if sys.platform.startswith("linux") and os.access(_TMPFS_ROOT, os.W_OK):
+        config.option.basetemp = tempfile.mkdtemp(prefix="pytest-", dir=_TMPFS_ROOT)
+        config.add_cleanup(
+            functools.partial(shutil.rmtree, config.option.basetemp, ignore_errors=True)
+        )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip ``slow`` tests unless ``--runslow`` is given, and skip
+    ``needs_llvmlite`` tests, deciding availability once per run."""
+    if not config.getoption("--runslow"):
+        skip_slow = pytest.mark.skip(reason="use --runslow to run")
+        for item in items:
+            if "slow" in item.keywords:
+                item.add_marker(skip_slow)
+
+    marked = [item for item in items if "needs_llvmlite" in item.keywords]
+    if not marked:
+        return
+    try:
+        from synapse.backends.llvm import LLVMLITE_AVAILABLE
+    except ImportError:
+        LLVMLITE_AVAILABLE = False
+    if not LLVMLITE_AVAILABLE:
+        skip = pytest.mark.skip(reason="llvmlite not installed")
+        for item in marked:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def shared_cli_config(tmp_path_factory):
+    """One CLIConfig for the session, rooted in a temporary directory.
+
+    Tests that mutate fields should do so through ``monkeypatch.setattr``
+    so the change is undone before the next test.
+    """
+    from synapse.cli.config import CLIConfig
+
+    root = tmp_path_factory.mktemp("synapse_home")
+    return CLIConfig(
+        cache_dir=root / "cache",
+        config_file=root / "config.json",
+        credentials_file=root / "credentials.json",
+        packages_dir=root / "packages",
+    )
+
+
+@pytest.fixture(scope="session")
+def llvm_backend_factory():
+    """Callable building LLVMBackend instances with LLVM initialized once.
+
+    Tests using it must be skipped when llvmlite is not installed.
+    """
+    from synapse.backends.llvm import LLVMBackend, _init_native_target
+
+    _init_native_target()
+
+    def make(opt_level=2, enable_jit=True):
+        return LLVMBackend(opt_level=opt_level, enable_jit=enable_jit)
+
+    return make
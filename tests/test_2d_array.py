@@ -1,15 +1,7 @@
-import sys
-sys.path.insert(0, 'src')
-from antlr4 import *
-from generated.SynapseLexer import SynapseLexer
-from generated.SynapseParser import SynapseParser
+from synapse.testing import parse_once
 
-code = "grid[x][y]"
-input_stream = InputStream(code)
-lexer = SynapseLexer(input_stream)
-tokens = CommonTokenStream(lexer)
-parser = SynapseParser(tokens)
-tree = parser.program()
 
-print("Full tree:")
-print(tree.toStringTree(recog=parser))
+def test_2d_subscript_parses_as_nested_primary():
+    tokens, tree = parse_once("grid[x][y]")
+    assert tree.parser.getNumberOfSyntaxErrors() == 0
+    assert "(primary (primary (primary grid) [" in tree.toStringTree(recog=tree.parser)
@@ -7,367 +7,325 @@ Test coverage:
 - Credentials handling
 """
 
+import argparse
+import sys
+
 import pytest
 import json
-import tempfile
+import requests
+from dataclasses import fields
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
-from synapse.cli.cli import SynapseCLI
-from synapse.cli.config import CLIConfig, CredentialsManager
-from synapse.cli.auth import AuthManager
+
+
+@pytest.fixture
+def cli_mod():
+    """SynapseCLI class, imported only when a test needs it."""
+    from synapse.cli.cli import SynapseCLI
+    return SynapseCLI
+
+
+@pytest.fixture(scope="module")
+def parser():
+    """One argument parser shared by the parsing tests; parse_args is pure."""
+    from synapse.cli.cli import SynapseCLI
+    return SynapseCLI().create_parser()
+
+
+@pytest.fixture
+def credentials_cls():
+    """CredentialsManager class, imported only when a test needs it."""
+    from synapse.cli.config import CredentialsManager
+    return CredentialsManager
+
+
+@pytest.fixture
+def auth_cls():
+    """AuthManager class, imported only when a test needs it."""
+    from synapse.cli.auth import AuthManager
+    return AuthManager
+
+
+@pytest.fixture(scope="module")
+def authed(tmp_path_factory):
+    """AuthManager with a token already stored; only for read-only tests."""
+    from synapse.cli.auth import AuthManager
+    from synapse.cli.config import CLIConfig
+    
+    root = tmp_path_factory.mktemp("auth")
+    config = CLIConfig(
+        cache_dir=root / "cache",
+        config_file=root / "config.json",
+        credentials_file=root / "creds.json",
+        packages_dir=root / "packages",
+    )
+    auth = AuthManager(config)
+    auth.credentials.store_token(config.registry_url, 'test_token')
+    return auth
 
 
 class TestCLIArgumentParsing:
     """Test argument parsing and command routing."""
     
-    def test_parse_publish_command(self):
-        """Test parsing publish command."""
-        cli = SynapseCLI()
-        args = cli.create_parser().parse_args(['publish', './mylib'])
-        
-        assert args.command == 'publish'
-        assert args.package == './mylib'
-    
-    def test_parse_install_command(self):
-        """Test parsing install command."""
-        cli = SynapseCLI()
-        args = cli.create_parser().parse_args(['install', 'mylib', 'other@1.0.0'])
-        
-        assert args.command == 'install'
-        assert args.packages == ['mylib', 'other@1.0.0']
-    
-    def test_parse_install_with_save(self):
-        """Test parsing install with --save flag."""
-        cli = SynapseCLI()
-        args = cli.create_parser().parse_args(['install', 'mylib', '--save'])
+    @pytest.mark.parametrize("argv,expected", [
+        (['publish', './mylib'], {'command': 'publish', 'package': './mylib'}),
+        (['install', 'mylib', 'other@1.0.0'],
+         {'command': 'install', 'packages': ['mylib', 'other@1.0.0']}),
+        (['install', 'mylib', '--save'], {'command': 'install', 'save': True}),
+        (['search', 'machine-learning', '--limit', '20'],
+         {'command': 'search', 'query': 'machine-learning', 'limit': 20}),
+        (['info', 'mylib', '--version', '1.2.3'],
+         {'command': 'info', 'package': 'mylib', 'version': '1.2.3'}),
+        (['list', '--global', '--depth', '2'],
+         {'command': 'list', 'global': True, 'depth': 2}),
+        (['login', '-u', 'user'], {'command': 'login', 'username': 'user'}),
+        (['update', 'mylib'], {'command': 'update', 'packages': ['mylib']}),
+        (['--verbose', 'list'], {'command': 'list', 'verbose': True}),
+    ], ids=['publish', 'install', 'install-save', 'search', 'info', 'list',
+            'login', 'update', 'verbose'])
+    def test_parse(self, parser, argv, expected):
+        """Test that parsing argv yields every expected attribute."""
+        ns = vars(parser.parse_args(argv))
         
-        assert args.command == 'install'
-        assert getattr(args, 'save', False) is True
+        assert expected.items() <= ns.items()
     
-    def test_parse_search_command(self):
-        """Test parsing search command."""
-        cli = SynapseCLI()
-        args = cli.create_parser().parse_args(['search', 'machine-learning', '--limit', '20'])
-        
-        assert args.command == 'search'
-        assert args.query == 'machine-learning'
-        assert args.limit == 20
-    
-    def test_parse_info_command(self):
-        """Test parsing info command."""
-        cli = SynapseCLI()
-        args = cli.create_parser().parse_args(['info', 'mylib', '--version', '1.2.3'])
-        
-        assert args.command == 'info'
-        assert args.package == 'mylib'
-        assert args.version == '1.2.3'
-    
-    def test_parse_list_command(self):
-        """Test parsing list command."""
-        cli = SynapseCLI()
-        args = cli.create_parser().parse_args(['list', '--global', '--depth', '2'])
-        
-        assert args.command == 'list'
-        assert getattr(args, 'global') is True
-        assert args.depth == 2
-    
-    def test_parse_login_command(self):
-        """Test parsing login command."""
-        cli = SynapseCLI()
-        args = cli.create_parser().parse_args(['login', '-u', 'user'])
-        
-        assert args.command == 'login'
-        assert args.username == 'user'
-    
-    def test_parse_update_command(self):
-        """Test parsing update command."""
-        cli = SynapseCLI()
-        args = cli.create_parser().parse_args(['update', 'mylib'])
-        
-        assert args.command == 'update'
-        assert args.packages == ['mylib']
-    
-    def test_version_flag(self):
+    def test_version_flag(self, parser, capsys):
         """Test --version flag."""
-        cli = SynapseCLI()
-        parser = cli.create_parser()
-        
         with pytest.raises(SystemExit):
             parser.parse_args(['--version'])
-    
-    def test_verbose_flag(self):
-        """Test --verbose flag."""
-        cli = SynapseCLI()
-        args = cli.create_parser().parse_args(['--verbose', 'list'])
         
-        assert args.verbose is True
+        assert 'synapse pkg' in capsys.readouterr().out
 
 
 class TestCLIConfig:
     """Test CLI configuration."""
     
-    def test_config_initialization(self):
+    def test_config_initialization(self, shared_cli_config):
         """Test config initialization with defaults."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config = CLIConfig()
-            
-            assert config.registry_url == 'https://registry.synapse.sh'
-            assert config.cache_ttl_hours == 24
-            assert config.max_retries == 3
+        config = shared_cli_config
+        
+        assert config.registry_url == 'https://registry.synapse.sh'
+        assert config.cache_ttl_hours == 24
+        assert config.max_retries == 3
     
-    def test_config_directories_creation(self):
+    def test_config_directories_creation(self, shared_cli_config):
         """Test that required directories are created."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config = CLIConfig()
-            
-            assert config.cache_dir.exists()
-            assert config.packages_dir.exists()
-    
-    def test_config_save_and_load(self):
-        """Test saving and loading configuration."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config = CLIConfig()
-            config.config_file = Path(tmpdir) / 'config.json'
-            config.cache_ttl_hours = 12
-            
-            config.save_config()
-            
-            assert config.config_file.exists()
-            
-            # Load in new instance
-            config2 = CLIConfig()
-            config2.config_file = config.config_file
-            config2._load_config()
-            
-            assert config2.cache_ttl_hours == 12
+        config = shared_cli_config
+        
+        assert config.cache_dir.exists()
+        assert config.packages_dir.exists()
     
-    def test_get_cache_path(self):
+    def test_get_cache_path(self, shared_cli_config):
         """Test getting cache file path."""
-        config = CLIConfig()
+        config = shared_cli_config
         cache_path = config.get_cache_path('test_key')
         
         assert cache_path.name == 'test_key.json'
         assert 'cache' in str(cache_path)
     
-    def test_cache_size_calculation(self):
-        """Test cache size calculation."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config = CLIConfig()
-            config.cache_dir = Path(tmpdir) / 'cache'
-            config.cache_dir.mkdir(parents=True)
-            
-            # Create test cache file
-            test_file = config.cache_dir / 'test.json'
-            test_file.write_bytes(b'x' * 1024)  # 1 KB
-            
-            size_mb = config.get_cache_size_mb()
-            assert size_mb > 0
-    
-    def test_cache_expiration(self):
-        """Test cache expiration checking."""
+    def test_config_full_lifecycle(self, shared_cli_config, monkeypatch, tmp_path):
+        """Test save/load, cache sizing, expiration and clearing on one config."""
+        import os
         import time
         
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config = CLIConfig()
-            config.cache_dir = Path(tmpdir) / 'cache'
-            config.cache_dir.mkdir(parents=True)
-            config.cache_ttl_hours = 0  # Immediate expiration
-            
-            test_file = config.cache_dir / 'test.json'
-            test_file.write_text('{}')
-            
-            time.sleep(0.1)
-            assert config.is_cache_expired(test_file)
-    
-    def test_clear_cache(self):
-        """Test clearing cache."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config = CLIConfig()
-            config.cache_dir = Path(tmpdir) / 'cache'
-            config.cache_dir.mkdir(parents=True)
-            
-            # Create test file
-            test_file = config.cache_dir / 'test.json'
-            test_file.write_text('{}')
-            
-            assert test_file.exists()
-            config.clear_cache()
-            assert not test_file.exists()
+        config = shared_cli_config
+        # _load_config overwrites every field, so register all for restore
+        for f in fields(config):
+            monkeypatch.setattr(config, f.name, getattr(config, f.name))
+        monkeypatch.setattr(config, 'config_file', tmp_path / 'config.json')
+        monkeypatch.setattr(config, 'cache_dir', tmp_path / 'cache')
+        config.cache_dir.mkdir(parents=True)
+        
+        # Save and reload configuration
+        monkeypatch.setattr(config, 'cache_ttl_hours', 12)
+        config.save_config()
+        
+        assert config.config_file.exists()
+        
+        # Load back over a reset value
+        monkeypatch.setattr(config, 'cache_ttl_hours', 24)
+        config._load_config()
+        
+        assert config.cache_ttl_hours == 12
+        
+        # Cache size calculation
+        test_file = config.cache_dir / 'test.json'
+        test_file.write_bytes(b'x' * 1024)  # 1 KB
+        
+        assert config.get_cache_size_mb() > 0
+        
+        # Cache expiration: back-date the mtime instead of sleeping
+        monkeypatch.setattr(config, 'cache_ttl_hours', 1)
+        assert not config.is_cache_expired(test_file)
+        
+        past = time.time() - 2 * 3600
+        os.utime(test_file, (past, past))
+        assert config.is_cache_expired(test_file)
+        
+        # Clearing the cache
+        config.clear_cache()
+        assert not test_file.exists()
+        assert list(config.cache_dir.iterdir()) == []
 
 
 class TestCredentialsManager:
     """Test credential storage and management."""
     
-    def test_store_and_retrieve_token(self):
+    def test_store_and_retrieve_token(self, shared_cli_config, monkeypatch, credentials_cls, tmp_path):
         """Test storing and retrieving authentication token."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config = CLIConfig()
-            config.credentials_file = Path(tmpdir) / 'creds.json'
-            
-            manager = CredentialsManager(config)
-            manager.store_token('https://registry.example.com', 'test_token', 'testuser')
-            
-            token = manager.get_token('https://registry.example.com')
-            assert token == 'test_token'
+        config = shared_cli_config
+        monkeypatch.setattr(config, 'credentials_file', tmp_path / 'creds.json')
+        
+        manager = credentials_cls(config)
+        manager.store_token('https://registry.example.com', 'test_token', 'testuser')
+        
+        token = manager.get_token('https://registry.example.com')
+        assert token == 'test_token'
     
-    def test_delete_token(self):
+    def test_delete_token(self, shared_cli_config, monkeypatch, credentials_cls, tmp_path):
         """Test deleting stored token."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config = CLIConfig()
-            config.credentials_file = Path(tmpdir) / 'creds.json'
-            
-            manager = CredentialsManager(config)
-            manager.store_token('https://registry.example.com', 'test_token')
-            
-            success = manager.delete_token('https://registry.example.com')
-            assert success is True
-            
-            token = manager.get_token('https://registry.example.com')
-            assert token is None
+        config = shared_cli_config
+        monkeypatch.setattr(config, 'credentials_file', tmp_path / 'creds.json')
+        
+        manager = credentials_cls(config)
+        manager.store_token('https://registry.example.com', 'test_token')
+        
+        success = manager.delete_token('https://registry.example.com')
+        assert success is True
+        
+        token = manager.get_token('https://registry.example.com')
+        assert token is None
     
-    def test_list_registries(self):
+    def test_list_registries(self, shared_cli_config, monkeypatch, credentials_cls, tmp_path):
         """Test listing configured registries."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config = CLIConfig()
-            config.credentials_file = Path(tmpdir) / 'creds.json'
-            
-            manager = CredentialsManager(config)
-            manager.store_token('https://registry1.example.com', 'token1')
-            manager.store_token('https://registry2.example.com', 'token2')
-            
-            registries = manager.list_registries()
-            assert len(registries) == 2
+        config = shared_cli_config
+        monkeypatch.setattr(config, 'credentials_file', tmp_path / 'creds.json')
+        
+        manager = credentials_cls(config)
+        manager.store_tokens_bulk({
+            'https://registry1.example.com': ('token1', ''),
+            'https://registry2.example.com': ('token2', ''),
+        })
+        
+        registries = manager.list_registries()
+        assert len(registries) == 2
+        
+        # Bulk store is persisted, not just held in memory
+        assert len(credentials_cls(config).list_registries()) == 2
     
-    def test_clear_all_credentials(self):
+    def test_clear_all_credentials(self, shared_cli_config, monkeypatch, credentials_cls, tmp_path):
         """Test clearing all credentials."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config = CLIConfig()
-            config.credentials_file = Path(tmpdir) / 'creds.json'
-            
-            manager = CredentialsManager(config)
-            manager.store_token('https://registry1.example.com', 'token1')
-            manager.store_token('https://registry2.example.com', 'token2')
-            
-            manager.clear_all()
-            
-            registries = manager.list_registries()
-            assert len(registries) == 0
+        config = shared_cli_config
+        monkeypatch.setattr(config, 'credentials_file', tmp_path / 'creds.json')
+        
+        manager = credentials_cls(config)
+        manager.store_tokens_bulk({
+            'https://registry1.example.com': ('token1', ''),
+            'https://registry2.example.com': ('token2', ''),
+        })
+        
+        manager.clear_all()
+        
+        registries = manager.list_registries()
+        assert len(registries) == 0
 
 
 class TestAuthManager:
     """Test authentication manager."""
     
     @patch('requests.post')
-    def test_login_success(self, mock_post):
+    def test_login_success(self, mock_post, shared_cli_config, monkeypatch, auth_cls, tmp_path):
         """Test successful login."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {'token': 'test_token'}
-        mock_post.return_value = mock_response
+        mock_post.return_value = MagicMock(
+            spec=requests.Response,
+            **{'status_code': 200, 'json.return_value': {'token': 'test_token'}}
+        )
         
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config = CLIConfig()
-            config.credentials_file = Path(tmpdir) / 'creds.json'
-            
-            auth = AuthManager(config)
-            success = auth.login('testuser', 'testpass')
-            
-            assert success is True
-            mock_post.assert_called_once()
+        config = shared_cli_config
+        monkeypatch.setattr(config, 'credentials_file', tmp_path / 'creds.json')
+        
+        auth = auth_cls(config)
+        success = auth.login('testuser', 'testpass')
+        
+        assert success is True
+        assert auth.get_token() == 'test_token'
     
     @patch('requests.post')
-    def test_login_failure(self, mock_post):
+    def test_login_failure(self, mock_post, shared_cli_config, monkeypatch, auth_cls, tmp_path):
         """Test failed login."""
         mock_response = Mock()
         mock_response.status_code = 401
         mock_post.return_value = mock_response
         
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config = CLIConfig()
-            config.credentials_file = Path(tmpdir) / 'creds.json'
-            
-            auth = AuthManager(config)
-            success = auth.login('testuser', 'wrongpass')
-            
-            assert success is False
+        config = shared_cli_config
+        monkeypatch.setattr(config, 'credentials_file', tmp_path / 'creds.json')
+        
+        auth = auth_cls(config)
+        success = auth.login('testuser', 'wrongpass')
+        
+        assert success is False
     
-    def test_get_token(self):
+    def test_get_token(self, authed):
         """Test getting stored token."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config = CLIConfig()
-            config.credentials_file = Path(tmpdir) / 'creds.json'
-            
-            auth = AuthManager(config)
-            auth.credentials.store_token(config.registry_url, 'test_token')
-            
-            token = auth.get_token()
-            assert token == 'test_token'
+        assert authed.get_token() == 'test_token'
     
-    def test_is_authenticated(self):
-        """Test authentication check."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config = CLIConfig()
-            config.credentials_file = Path(tmpdir) / 'creds.json'
-            
-            auth = AuthManager(config)
-            
-            assert not auth.is_authenticated()
-            
-            auth.credentials.store_token(config.registry_url, 'test_token')
-            assert auth.is_authenticated()
+    def test_is_authenticated(self, authed):
+        """Test authentication check with a stored token."""
+        assert authed.is_authenticated()
+    
+    def test_is_not_authenticated(self, shared_cli_config, monkeypatch, auth_cls, tmp_path):
+        """Test authentication check without a stored token."""
+        config = shared_cli_config
+        monkeypatch.setattr(config, 'credentials_file', tmp_path / 'creds.json')
+        
+        auth = auth_cls(config)
+        
+        assert not auth.is_authenticated()
     
     @patch('requests.post')
-    def test_verify_token(self, mock_post):
+    def test_verify_token(self, mock_post, authed):
         """Test token verification."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_post.return_value = mock_response
+        mock_post.return_value = MagicMock(spec=requests.Response, status_code=200)
         
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config = CLIConfig()
-            config.credentials_file = Path(tmpdir) / 'creds.json'
-            
-            auth = AuthManager(config)
-            auth.credentials.store_token(config.registry_url, 'test_token')
-            
-            valid = auth.verify_token()
-            assert valid is True
+        valid = authed.verify_token()
+        assert valid is True
     
-    def test_get_headers_with_token(self):
+    def test_get_headers_with_token(self, authed):
         """Test getting HTTP headers with authentication."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config = CLIConfig()
-            config.credentials_file = Path(tmpdir) / 'creds.json'
-            
-            auth = AuthManager(config)
-            auth.credentials.store_token(config.registry_url, 'test_token')
-            
-            headers = auth.get_headers()
-            assert 'Authorization' in headers
-            assert headers['Authorization'] == 'Bearer test_token'
+        headers = authed.get_headers()
+        assert 'Authorization' in headers
+        assert headers['Authorization'] == 'Bearer test_token'
 
 
 class TestCLIRunMethod:
     """Test CLI run method."""
     
-    def test_run_with_no_command(self):
+    def test_run_with_no_command(self, cli_mod):
         """Test running with no command."""
-        cli = SynapseCLI()
+        cli = cli_mod()
         
         with patch('sys.stdout'):
             exit_code = cli.run([])
         
         assert exit_code == 0
     
-    def test_run_with_unknown_command(self):
+    def test_run_with_unknown_command(self, cli_mod):
         """Test running with unknown command."""
-        cli = SynapseCLI()
+        cli = cli_mod()
         
         # argparse exits with code 2 for invalid commands
         with pytest.raises(SystemExit) as exc_info:
             cli.run(['unknown'])
         
         assert exc_info.value.code == 2
+    
+    @pytest.mark.skipif(sys.version_info < (3, 9), reason="exit_on_error needs Python 3.9+")
+    def test_parse_unknown_command_raises(self, cli_mod):
+        """Test that a non-exiting parser raises instead of printing usage."""
+        parser = cli_mod().create_parser(exit_on_error=False)
+        
+        with pytest.raises(argparse.ArgumentError):
+            parser.parse_args(['unknown'])
 
 
 if __name__ == '__main__':
@@ -7,253 +7,212 @@ Test coverage:
 - Conflict detection
 """
 
+import operator
+
 import pytest
-from unittest.mock import Mock, patch
-from synapse.cli.resolver import SemanticVersion, DependencyResolver
-from synapse.cli.config import CLIConfig
+from unittest.mock import Mock
+
+
+def _mk_resp(versions):
+    """Build a 200 response listing the given versions."""
+    r = Mock()
+    r.status_code = 200
+    r.json.return_value = {'versions': versions}
+    return r
+
+
+def _mk_resp_json(data):
+    """Build a 200 response with the given JSON body."""
+    r = Mock()
+    r.status_code = 200
+    r.json.return_value = data
+    return r
+
+
+# Shared by tests that see the same version listing
+_RESP_123 = _mk_resp(['1.2.3', '1.2.2', '1.2.1'])
+
+# URL fragment -> response for the mylib -> dep1 graph, checked in order
+# ('versions' must win over the package-path fragments)
+_DEP_GRAPH_RESPONSES = {
+    'versions': _mk_resp(['1.0.0']),
+    'packages/mylib/1.0.0': _mk_resp_json({'dependencies': {'dep1': '1.0.0'}}),
+    'packages/dep1': _mk_resp_json({'dependencies': {}}),
+}
+_NOT_FOUND = Mock(status_code=404)
+
+
+def _dependency_graph_get(url, **kwargs):
+    return next(
+        (r for frag, r in _DEP_GRAPH_RESPONSES.items() if frag in url),
+        _NOT_FOUND
+    )
+
+
+@pytest.fixture
+def semver_cls():
+    """SemanticVersion class, imported only when a test needs it."""
+    from synapse.cli.resolver import SemanticVersion
+    return SemanticVersion
+
+
+@pytest.fixture(scope="module")
+def versions():
+    """SemanticVersion instances built once and shared by the range tests."""
+    from synapse.cli.resolver import SemanticVersion
+    return {v: SemanticVersion(v) for v in ('1.2.2', '1.2.3', '1.2.4', '1.2.5')}
+
+
+@pytest.fixture(scope="module")
+def shared_resolver(shared_cli_config):
+    """One DependencyResolver for the module."""
+    from synapse.cli.resolver import DependencyResolver
+    return DependencyResolver(shared_cli_config)
+
+
+@pytest.fixture
+def resolver(shared_resolver):
+    """The shared resolver with its version cache emptied for this test."""
+    shared_resolver._version_cache.clear()
+    return shared_resolver
+
+
+@pytest.fixture
+def mock_get(monkeypatch):
+    """Mock installed as requests.get for the duration of a test."""
+    get = Mock()
+    monkeypatch.setattr('requests.get', get)
+    return get
 
 
 class TestSemanticVersion:
     """Test semantic version parsing and comparison."""
     
-    def test_parse_simple_version(self):
-        """Test parsing simple semantic version."""
-        v = SemanticVersion('1.2.3')
-        
-        assert v.major == 1
-        assert v.minor == 2
-        assert v.patch == 3
-        assert v.prerelease is None
-        assert v.build is None
-    
-    def test_parse_prerelease_version(self):
-        """Test parsing prerelease version."""
-        v = SemanticVersion('1.2.3-beta.1')
-        
-        assert v.major == 1
-        assert v.minor == 2
-        assert v.patch == 3
-        assert v.prerelease == 'beta.1'
-    
-    def test_parse_build_metadata(self):
-        """Test parsing build metadata."""
-        v = SemanticVersion('1.2.3+build.123')
-        
-        assert v.major == 1
-        assert v.minor == 2
-        assert v.patch == 3
-        assert v.build == 'build.123'
-    
-    def test_parse_full_version(self):
-        """Test parsing complete version string."""
-        v = SemanticVersion('1.2.3-rc.1+build.456')
-        
-        assert v.major == 1
-        assert v.minor == 2
-        assert v.patch == 3
-        assert v.prerelease == 'rc.1'
-        assert v.build == 'build.456'
-    
-    def test_version_equality(self):
-        """Test version equality comparison."""
-        v1 = SemanticVersion('1.2.3')
-        v2 = SemanticVersion('1.2.3')
-        v3 = SemanticVersion('1.2.4')
-        
-        assert v1 == v2
-        assert not (v1 == v3)
-        assert v1 == '1.2.3'
-    
-    def test_version_less_than(self):
-        """Test less than comparison."""
-        v1 = SemanticVersion('1.2.3')
-        v2 = SemanticVersion('1.2.4')
-        v3 = SemanticVersion('2.0.0')
-        
-        assert v1 < v2
-        assert v1 < v3
-        assert v2 < v3
-        assert not (v2 < v1)
-    
-    def test_prerelease_less_than_release(self):
-        """Test that prerelease is less than release."""
-        v1 = SemanticVersion('1.2.3-beta')
-        v2 = SemanticVersion('1.2.3')
-        
-        assert v1 < v2
-        assert not (v2 < v1)
-    
-    def test_version_greater_than(self):
-        """Test greater than comparison."""
-        v1 = SemanticVersion('2.0.0')
-        v2 = SemanticVersion('1.2.3')
-        
-        assert v1 > v2
-        assert not (v2 > v1)
-    
-    def test_version_string_representation(self):
+    @pytest.mark.parametrize("s,major,minor,patch,pre,build", [
+        ('1.2.3', 1, 2, 3, None, None),
+        ('1.2.3-beta.1', 1, 2, 3, 'beta.1', None),
+        ('1.2.3+build.123', 1, 2, 3, None, 'build.123'),
+        ('1.2.3-rc.1+build.456', 1, 2, 3, 'rc.1', 'build.456'),
+    ])
+    def test_parse_version(self, semver_cls, s, major, minor, patch, pre, build):
+        """Test parsing version strings with prerelease and build parts."""
+        v = semver_cls(s)
+        
+        assert (v.major, v.minor, v.patch) == (major, minor, patch)
+        assert v.prerelease == pre
+        assert v.build == build
+    
+    @pytest.mark.parametrize("a,op,b,expected", [
+        ('1.2.3', operator.eq, '1.2.3', True),
+        ('1.2.3', operator.eq, '1.2.4', False),
+        ('1.2.3', operator.lt, '1.2.4', True),
+        ('1.2.3', operator.lt, '2.0.0', True),
+        ('1.2.4', operator.lt, '2.0.0', True),
+        ('1.2.4', operator.lt, '1.2.3', False),
+        ('1.2.3-beta', operator.lt, '1.2.3', True),
+        ('1.2.3', operator.lt, '1.2.3-beta', False),
+        ('2.0.0', operator.gt, '1.2.3', True),
+        ('1.2.3', operator.gt, '2.0.0', False),
+    ])
+    def test_version_comparison(self, semver_cls, a, op, b, expected):
+        """Test ordering and equality between versions."""
+        assert op(semver_cls(a), semver_cls(b)) is expected
+    
+    def test_version_equals_string(self, semver_cls):
+        """Test equality against a plain version string."""
+        assert semver_cls('1.2.3') == '1.2.3'
+    
+    def test_version_string_representation(self, semver_cls):
         """Test string representation."""
-        v = SemanticVersion('1.2.3-beta.1')
+        v = semver_cls('1.2.3-beta.1')
         assert str(v) == '1.2.3-beta.1'
     
-    def test_match_exact_version(self):
-        """Test matching exact version."""
-        v = SemanticVersion('1.2.3')
-        
-        assert v.matches_range('1.2.3')
-        assert not v.matches_range('1.2.4')
-    
-    def test_match_caret_range(self):
-        """Test matching caret range (^1.2.3)."""
-        v = SemanticVersion('1.2.5')
-        
-        assert v.matches_range('^1.2.3')
-        assert v.matches_range('^1.0.0')
-        assert not v.matches_range('^2.0.0')
-    
-    def test_match_tilde_range(self):
-        """Test matching tilde range (~1.2.3)."""
-        v = SemanticVersion('1.2.5')
-        
-        assert v.matches_range('~1.2.3')
-        assert v.matches_range('~1.2.0')
-        assert not v.matches_range('~1.3.0')
-    
-    def test_match_greater_than(self):
-        """Test matching greater than."""
-        v = SemanticVersion('1.2.4')
-        
-        assert v.matches_range('>=1.2.3')
-        assert v.matches_range('>1.2.3')
-        assert not v.matches_range('>=1.2.5')
-    
-    def test_match_less_than(self):
-        """Test matching less than."""
-        v = SemanticVersion('1.2.2')
-        
-        assert v.matches_range('<=1.2.3')
-        assert v.matches_range('<1.2.3')
-        assert not v.matches_range('<=1.2.1')
+    @pytest.mark.parametrize("version,spec,ok", [
+        # Exact
+        ('1.2.3', '1.2.3', True),
+        ('1.2.3', '1.2.4', False),
+        # Caret (^1.2.3)
+        ('1.2.5', '^1.2.3', True),
+        ('1.2.5', '^1.0.0', True),
+        ('1.2.5', '^2.0.0', False),
+        # Tilde (~1.2.3)
+        ('1.2.5', '~1.2.3', True),
+        ('1.2.5', '~1.2.0', True),
+        ('1.2.5', '~1.3.0', False),
+        # Greater than
+        ('1.2.4', '>=1.2.3', True),
+        ('1.2.4', '>1.2.3', True),
+        ('1.2.4', '>=1.2.5', False),
+        # Less than
+        ('1.2.2', '<=1.2.3', True),
+        ('1.2.2', '<1.2.3', True),
+        ('1.2.2', '<=1.2.1', False),
+    ])
+    def test_matches_range(self, versions, version, spec, ok):
+        """Test matching versions against range specifications."""
+        assert versions[version].matches_range(spec) is ok
+    
+    def test_range_parse_is_cached(self, versions):
+        """Test that repeated range checks reuse the parsed spec."""
+        from synapse.cli.resolver import _parse_range
+        _parse_range.cache_clear()
+        
+        for v in versions.values():
+            v.matches_range('^1.2.3')
+        
+        assert _parse_range.cache_info().misses == 1
 
 
 class TestDependencyResolver:
     """Test dependency resolution."""
     
-    @patch('requests.get')
-    def test_resolve_version_exact(self, mock_get):
+    def test_resolve_version_exact(self, mock_get, resolver):
         """Test resolving exact version."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            'versions': ['1.2.3', '1.2.2', '1.2.1']
-        }
-        mock_get.return_value = mock_response
-        
-        config = CLIConfig()
-        resolver = DependencyResolver(config)
+        mock_get.return_value = _RESP_123
         
         version = resolver.resolve_version('mylib', '1.2.3')
         assert version == '1.2.3'
     
-    @patch('requests.get')
-    def test_resolve_version_latest(self, mock_get):
+    def test_resolve_version_latest(self, mock_get, resolver):
         """Test resolving to latest version."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            'versions': ['2.0.0', '1.5.0', '1.4.0']
-        }
-        mock_get.return_value = mock_response
-        
-        config = CLIConfig()
-        resolver = DependencyResolver(config)
+        mock_get.return_value = _mk_resp(['2.0.0', '1.5.0', '1.4.0'])
         
         version = resolver.resolve_version('mylib')
         assert version == '2.0.0'
     
-    @patch('requests.get')
-    def test_resolve_version_range(self, mock_get):
+    def test_resolve_version_range(self, mock_get, resolver):
         """Test resolving version from range."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            'versions': ['2.0.0', '1.5.3', '1.5.2', '1.5.1', '1.0.0']
-        }
-        mock_get.return_value = mock_response
-        
-        config = CLIConfig()
-        resolver = DependencyResolver(config)
+        mock_get.return_value = _mk_resp(['2.0.0', '1.5.3', '1.5.2', '1.5.1', '1.0.0'])
         
         version = resolver.resolve_version('mylib', '^1.5.0')
         assert version in ['1.5.3', '1.5.2', '1.5.1']
     
-    @patch('requests.get')
-    def test_resolve_version_not_found(self, mock_get):
+    def test_resolve_version_not_found(self, mock_get, resolver):
         """Test when version cannot be resolved."""
         mock_response = Mock()
         mock_response.status_code = 404
         mock_get.return_value = mock_response
         
-        config = CLIConfig()
-        resolver = DependencyResolver(config)
-        
         version = resolver.resolve_version('nonexistent', '1.0.0')
         assert version is None
     
-    @patch('requests.get')
-    def test_get_available_versions(self, mock_get):
+    def test_get_available_versions(self, mock_get, resolver):
         """Test getting available versions."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            'versions': ['1.2.3', '1.2.2', '1.2.1']
-        }
-        mock_get.return_value = mock_response
-        
-        config = CLIConfig()
-        resolver = DependencyResolver(config)
+        mock_get.return_value = _RESP_123
         
         versions = resolver._get_available_versions('mylib')
         assert len(versions) == 3
         assert versions[0] == '1.2.3'  # Should be sorted descending
     
-    @patch('requests.get')
-    def test_resolve_dependencies(self, mock_get):
+    def test_resolve_dependencies(self, mock_get, resolver):
         """Test resolving all dependencies recursively."""
-        def mock_get_side_effect(url, **kwargs):
-            response = Mock()
-            
-            if 'versions' in url:
-                response.status_code = 200
-                response.json.return_value = {'versions': ['1.0.0']}
-            elif 'packages/mylib/1.0.0' in url:
-                response.status_code = 200
-                response.json.return_value = {
-                    'dependencies': {'dep1': '1.0.0'}
-                }
-            elif 'packages/dep1' in url:
-                response.status_code = 200
-                response.json.return_value = {
-                    'dependencies': {}
-                }
-            else:
-                response.status_code = 404
-            
-            return response
-        
-        mock_get.side_effect = mock_get_side_effect
-        
-        config = CLIConfig()
-        resolver = DependencyResolver(config)
+        mock_get.side_effect = _dependency_graph_get
         
         deps = resolver.resolve_dependencies('mylib', '1.0.0')
         assert 'dep1' in deps
     
-    def test_detect_conflicts(self):
+    def test_detect_conflicts(self, resolver):
         """Test detecting version conflicts."""
-        config = CLIConfig()
-        resolver = DependencyResolver(config)
-        
         deps = {
             'pkg1': {'shared': '1.0.0'},
             'pkg2': {'shared': '2.0.0'}
@@ -263,11 +222,8 @@ class TestDependencyResolver:
         assert len(conflicts) > 0
         assert conflicts[0][0] == 'shared'
     
-    def test_no_conflicts(self):
+    def test_no_conflicts(self, resolver):
         """Test when there are no conflicts."""
-        config = CLIConfig()
-        resolver = DependencyResolver(config)
-        
         deps = {
             'pkg1': {'shared': '1.0.0'},
             'pkg2': {'shared': '1.0.0'}
@@ -276,18 +232,9 @@ class TestDependencyResolver:
         conflicts = resolver.detect_conflicts(deps)
         assert len(conflicts) == 0
     
-    @patch('requests.get')
-    def test_version_cache(self, mock_get):
+    def test_version_cache(self, mock_get, resolver):
         """Test version caching."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            'versions': ['1.0.0']
-        }
-        mock_get.return_value = mock_response
-        
-        config = CLIConfig()
-        resolver = DependencyResolver(config)
+        mock_get.return_value = _mk_resp(['1.0.0'])
         
         # First call
         resolver._get_available_versions('mylib')
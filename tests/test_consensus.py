@@ -1,6 +1,3 @@
-import sys
-sys.path.insert(0, 'src')
-
 from synapse.core.consensus import consensus
 
 def test_consensus():
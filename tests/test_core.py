@@ -1,6 +1,4 @@
 import pytest
-import sys
-sys.path.insert(0, 'src')
 
 from synapse.core.distributions import normal, bernoulli, uniform
 from synapse.core.morphing import Morpher
@@ -1,8 +1,6 @@
-import sys
-sys.path.insert(0, 'src')
-
-def test_sync():
-    from synapse.core.distributed import shared_state, update_shared, read_shared
-    update_shared("agent", "key", "value")
-    result = read_shared("agent", "key")
+def test_sync(monkeypatch):
+    from synapse.core import distributed
+    monkeypatch.setattr(distributed, 'shared_state', {})
+    distributed.update_shared("agent", "key", "value")
+    result = distributed.read_shared("agent", "key")
     assert "value" in result
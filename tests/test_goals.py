@@ -1,6 +1,3 @@
-import sys
-sys.path.insert(0, 'src')
-
 from synapse.core.goals import parse_goal, infer_plan
 
 def test_goal_parse():
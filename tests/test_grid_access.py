@@ -1,5 +1,3 @@
-import sys
-sys.path.insert(0, 'src')
 from synapse.parser.parser import parse_and_execute
 
 # Test simple 2D array
@@ -9,10 +7,8 @@ let val = grid[0][1]
 print(val)
 """
 
-try:
-    result = parse_and_execute(code)
-    print(f"Result: {result}")
-except Exception as e:
-    print(f"Error: {e}")
-    import traceback
-    traceback.print_exc()
+
+def test_grid_access(capsys):
+    parse_and_execute(code)
+    printed = capsys.readouterr().out.splitlines()
+    assert printed[0] == "2.0"
@@ -2,176 +2,267 @@
 Tests for lock file management functionality.
 """
 
+import hashlib
+import io
 import json
-import tempfile
-from pathlib import Path
+import os
+import tracemalloc
 import pytest
+from dataclasses import asdict
 from datetime import datetime
 
+from synapse.cli import lockfile
 from synapse.cli.lockfile import (
+    IJSON_AVAILABLE,
     DependencyLock,
     LockFileManager,
 )
 
+# Fixed file contents and their digests, computed once at import
+_HELLO_WORLD = b"hello world"
+_HELLO_WORLD_SHA256 = hashlib.sha256(_HELLO_WORLD).hexdigest()
+_TEST_CONTENT = b"test content"
+_TEST_CONTENT_SHA256 = hashlib.sha256(_TEST_CONTENT).hexdigest()
 
-class TestDependencyLock:
-    """Test DependencyLock data class."""
-    
-    def test_create_dependency_lock(self):
-        """Test creating a DependencyLock."""
-        dep = DependencyLock(
+
+@pytest.fixture
+def manager(tmp_path):
+    """LockFileManager rooted in a fresh per-test directory."""
+    return LockFileManager(tmp_path)
+
+
+@pytest.fixture(scope="module")
+def mem_manager():
+    """Shared LockFileManager for tests that only touch in-memory dicts."""
+    return LockFileManager()
+
+
+@pytest.fixture(scope="module")
+def flask_deps():
+    """Small flask -> werkzeug/jinja2 graph shared by the resolver tests."""
+    return {
+        "flask": DependencyLock(
+            name="flask",
+            version="2.0.0",
+            checksum="flask123",
+            resolved_from="^2.0.0",
+            dependencies={"werkzeug": "2.0.0", "jinja2": "3.0.0"},
+        ),
+        "werkzeug": DependencyLock(
+            name="werkzeug",
+            version="2.0.0",
+            checksum="wz123",
+            resolved_from="^2.0.0",
+            dependencies={"dataclasses": "0.6"},
+        ),
+        "jinja2": DependencyLock(
+            name="jinja2",
+            version="3.0.0",
+            checksum="j2123",
+            resolved_from="^3.0.0",
+            dependencies={},
+        ),
+    }
+
+
+@pytest.fixture(scope="module")
+def numpy_deps_bytes():
+    """numpy -> cython lock and its lock file bytes, serialized once."""
+    deps = {
+        "numpy": DependencyLock(
             name="numpy",
             version="1.21.0",
             checksum="abc123",
             resolved_from="^1.20.0",
-        )
-        
-        assert dep.name == "numpy"
-        assert dep.version == "1.21.0"
-        assert dep.checksum == "abc123"
-        assert dep.resolved_from == "^1.20.0"
-        assert dep.dependencies == {}
+            dependencies={"cython": "0.29.0"},
+        ),
+        "cython": DependencyLock(
+            name="cython",
+            version="0.29.0",
+            checksum="cython123",
+            resolved_from="^0.29.0",
+        ),
+    }
+    return deps, LockFileManager()._serialize(deps)
+
+
+class TestDependencyLock:
+    """Test DependencyLock data class."""
     
-    def test_dependency_lock_with_transitive(self):
-        """Test DependencyLock with transitive dependencies."""
-        dep = DependencyLock(
-            name="flask",
-            version="2.0.0",
-            checksum="def456",
-            resolved_from="^2.0.0",
-            dependencies={"werkzeug": "2.0.0", "jinja2": "3.0.0"},
-        )
+    @pytest.mark.parametrize("kwargs,expected", [
+        (
+            dict(name="numpy", version="1.21.0", checksum="abc123",
+                 resolved_from="^1.20.0"),
+            dict(name="numpy", version="1.21.0", checksum="abc123",
+                 resolved_from="^1.20.0", dependencies={}),
+        ),
+        (
+            dict(name="flask", version="2.0.0", checksum="def456",
+                 resolved_from="^2.0.0",
+                 dependencies={"werkzeug": "2.0.0", "jinja2": "3.0.0"}),
+            dict(dependencies={"werkzeug": "2.0.0", "jinja2": "3.0.0"}),
+        ),
+        (
+            dict(name="pytest", version="7.0.0", checksum="ghi789",
+                 resolved_from="^6.0.0", dependencies={"pluggy": "1.0.0"}),
+            dict(version="7.0.0", checksum="ghi789", resolved_from="^6.0.0",
+                 dependencies={"pluggy": "1.0.0"}),
+        ),
+        (
+            dict(name="mylib", version="1.0.0", checksum="xyz",
+                 resolved_from="^1.0.0", dependencies={"dep1": "1.0.0"},
+                 installed_at="2024-01-01T00:00:00"),
+            dict(name="mylib", version="1.0.0", checksum="xyz",
+                 dependencies={"dep1": "1.0.0"},
+                 installed_at="2024-01-01T00:00:00"),
+        ),
+    ], ids=["plain", "transitive", "to_dict", "from_dict"])
+    def test_dependency_lock_round_trip(self, kwargs, expected):
+        """Test constructing a DependencyLock and round-tripping it via dicts."""
+        dep = DependencyLock(**kwargs)
         
-        assert dep.dependencies == {
-            "werkzeug": "2.0.0",
-            "jinja2": "3.0.0",
-        }
-    
-    def test_dependency_lock_to_dict(self):
-        """Test converting DependencyLock to dict."""
-        dep = DependencyLock(
-            name="pytest",
-            version="7.0.0",
-            checksum="ghi789",
-            resolved_from="^6.0.0",
-            dependencies={"pluggy": "1.0.0"},
-        )
+        assert expected.items() <= asdict(dep).items()
         
         data = dep.to_dict()
-        
-        assert data["version"] == "7.0.0"
-        assert data["checksum"] == "ghi789"
-        assert data["resolved_from"] == "^6.0.0"
-        assert data["dependencies"] == {"pluggy": "1.0.0"}
         assert "installed_at" in data
-    
-    def test_dependency_lock_from_dict(self):
-        """Test creating DependencyLock from dict."""
-        data = {
-            "version": "1.0.0",
-            "checksum": "xyz",
-            "resolved_from": "^1.0.0",
-            "dependencies": {"dep1": "1.0.0"},
-            "installed_at": "2024-01-01T00:00:00",
-        }
-        
-        dep = DependencyLock.from_dict("mylib", data)
-        
-        assert dep.name == "mylib"
-        assert dep.version == "1.0.0"
-        assert dep.checksum == "xyz"
-        assert dep.dependencies == {"dep1": "1.0.0"}
+        assert "name" not in data
+        assert DependencyLock.from_dict(dep.name, data) == dep
 
 
 class TestLockFileManager:
     """Test LockFileManager."""
     
-    def test_lock_file_path(self):
+    @pytest.mark.xdist_group("lockfile_io")
+    def test_lock_file_path(self, manager, tmp_path):
         """Test lock file path computation."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = LockFileManager(Path(tmpdir))
-            expected_path = Path(tmpdir) / "synapse-lock.json"
-            assert manager.lock_path == expected_path
+        expected_path = tmp_path / "synapse-lock.json"
+        assert manager.lock_path == expected_path
     
-    def test_exists_false_when_not_present(self):
+    @pytest.mark.xdist_group("lockfile_io")
+    def test_exists_false_when_not_present(self, manager):
         """Test exists() returns False when lock file doesn't exist."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = LockFileManager(Path(tmpdir))
-            assert not manager.exists()
+        assert not manager.exists()
     
-    def test_exists_true_when_present(self):
+    @pytest.mark.xdist_group("lockfile_io")
+    def test_exists_true_when_present(self, manager, tmp_path):
         """Test exists() returns True when lock file exists."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            lock_path = Path(tmpdir) / "synapse-lock.json"
-            lock_path.write_text('{"lockfile_version": 1, "dependencies": {}}')
-            
-            manager = LockFileManager(Path(tmpdir))
-            assert manager.exists()
-    
-    def test_load_empty_when_not_present(self):
+        lock_path = tmp_path / "synapse-lock.json"
+        lock_path.write_text('{"lockfile_version": 1, "dependencies": {}}')
+        
+        assert manager.exists()
+    
+    @pytest.mark.xdist_group("lockfile_io")
+    def test_load_empty_when_not_present(self, manager):
         """Test load() returns empty dict when lock file doesn't exist."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = LockFileManager(Path(tmpdir))
-            deps = manager.load()
-            assert deps == {}
+        deps = manager.load()
+        assert deps == {}
     
-    def test_save_and_load(self):
+    @pytest.mark.xdist_group("lockfile_io")
+    def test_save_and_load(self, manager, numpy_deps_bytes):
         """Test save() and load() round-trip."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = LockFileManager(Path(tmpdir))
-            
-            # Create dependencies
-            deps = {
-                "numpy": DependencyLock(
-                    name="numpy",
-                    version="1.21.0",
-                    checksum="abc123",
-                    resolved_from="^1.20.0",
-                    dependencies={"cython": "0.29.0"},
-                )
-            }
-            
-            # Save
-            manager.save(deps)
-            assert manager.exists()
-            
-            # Load
-            loaded = manager.load()
-            assert "numpy" in loaded
-            assert loaded["numpy"].version == "1.21.0"
-            assert loaded["numpy"].dependencies == {"cython": "0.29.0"}
-    
-    def test_load_malformed_file_raises_error(self):
+        deps, _ = numpy_deps_bytes
+        
+        # Save
+        manager.save(deps)
+        assert manager.exists()
+        
+        # Load
+        loaded = manager.load()
+        assert loaded == deps
+        assert loaded["numpy"].dependencies == {"cython": "0.29.0"}
+    
+    @pytest.mark.xdist_group("lockfile_io")
+    def test_load_serialized_payload(self, manager, numpy_deps_bytes):
+        """Test load() reads bytes produced by _serialize()."""
+        deps, payload = numpy_deps_bytes
+        manager.lock_path.write_bytes(payload)
+        
+        assert manager.load() == deps
+    
+    def test_serialize_writes_raw_utf8(self, mem_manager):
+        """Test lock files keep non-ASCII text as UTF-8, with or without orjson."""
+        deps = {
+            "café": DependencyLock(
+                name="café",
+                version="1.0.0",
+                checksum="c1",
+                resolved_from="^1.0.0",
+            )
+        }
+        payload = mem_manager._serialize(deps)
+        
+        assert '"café"'.encode() in payload
+        assert b"\\u00e9" not in payload
+    
+    def test_load_small_file_is_not_streamed(self, numpy_deps_bytes, monkeypatch):
+        """Test load() decodes files under the threshold in one go."""
+        deps, payload = numpy_deps_bytes
+        manager = LockFileManager(storage=io.BytesIO(payload))
+        monkeypatch.setattr(manager, "_stream_load", pytest.fail)
+        
+        assert manager.load() == deps
+    
+    @pytest.mark.skipif(not IJSON_AVAILABLE, reason="ijson not installed")
+    def test_load_large_file_is_streamed(self, numpy_deps_bytes, monkeypatch):
+        """Test load() streams files over the threshold through ijson."""
+        deps, payload = numpy_deps_bytes
+        manager = LockFileManager(storage=io.BytesIO(payload))
+        monkeypatch.setattr(lockfile, "_STREAM_LOAD_THRESHOLD", len(payload) - 1)
+        calls = []
+        stream_load = manager._stream_load
+        monkeypatch.setattr(
+            manager, "_stream_load", lambda: calls.append(1) or stream_load()
+        )
+        
+        assert manager.load() == deps
+        assert calls == [1]
+    
+    @pytest.mark.xdist_group("lockfile_io")
+    def test_load_malformed_file_raises_error(self, manager, tmp_path):
         """Test load() raises ValueError for malformed JSON."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            lock_path = Path(tmpdir) / "synapse-lock.json"
-            lock_path.write_text("{ invalid json")
-            
-            manager = LockFileManager(Path(tmpdir))
-            
-            with pytest.raises(ValueError, match="malformed"):
+        lock_path = tmp_path / "synapse-lock.json"
+        lock_path.write_text("{ invalid json")
+        
+        with pytest.raises(ValueError) as exc_info:
+            manager.load()
+        assert "malformed" in str(exc_info.value)
+    
+    @pytest.mark.skipif(not IJSON_AVAILABLE, reason="ijson not installed")
+    @pytest.mark.xdist_group("lockfile_io")
+    def test_load_malformed_large_file_is_streamed(self, manager, tmp_path):
+        """Test load() rejects a large malformed file without buffering it."""
+        lock_path = tmp_path / "synapse-lock.json"
+        lock_path.write_bytes(b"{" + b" " * (2 * 1024 * 1024) + b"{ invalid json")
+        
+        tracemalloc.start()
+        try:
+            with pytest.raises(ValueError) as exc_info:
                 manager.load()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            lock_path.unlink()
+        
+        assert "malformed" in str(exc_info.value)
+        assert peak < 1024 * 1024
     
-    def test_load_incompatible_version_raises_error(self):
+    @pytest.mark.xdist_group("lockfile_io")
+    def test_load_incompatible_version_raises_error(self, manager, tmp_path):
         """Test load() raises ValueError for incompatible lock file version."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            lock_path = Path(tmpdir) / "synapse-lock.json"
-            lock_path.write_text(json.dumps({
-                "lockfile_version": 999,
-                "dependencies": {}
-            }))
-            
-            manager = LockFileManager(Path(tmpdir))
-            
-            with pytest.raises(ValueError, match="version"):
-                manager.load()
+        lock_path = tmp_path / "synapse-lock.json"
+        lock_path.write_text(json.dumps({
+            "lockfile_version": 999,
+            "dependencies": {}
+        }))
+        
+        with pytest.raises(ValueError) as exc_info:
+            manager.load()
+        assert "version" in str(exc_info.value)
     
-    def test_add_dependency(self):
+    def test_add_dependency(self, mem_manager):
         """Test add_dependency()."""
         deps = {}
-        manager = LockFileManager()
-        
-        result = manager.add_dependency(
+        result = mem_manager.add_dependency(
             deps,
             name="requests",
             version="2.28.0",
@@ -184,7 +275,7 @@ class TestLockFileManager:
         assert result["requests"].version == "2.28.0"
         assert result["requests"].dependencies == {"urllib3": "1.26.0"}
     
-    def test_remove_dependency(self):
+    def test_remove_dependency(self, mem_manager):
         """Test remove_dependency()."""
         deps = {
             "numpy": DependencyLock(
@@ -194,93 +285,105 @@ class TestLockFileManager:
                 resolved_from="^1.21.0",
             )
         }
-        manager = LockFileManager()
-        
-        result = manager.remove_dependency(deps, "numpy")
+        result = mem_manager.remove_dependency(deps, "numpy")
         
         assert "numpy" not in result
     
-    def test_get_transitive_dependencies(self):
+    def test_get_transitive_dependencies(self, mem_manager, flask_deps):
         """Test get_transitive_dependencies()."""
-        manager = LockFileManager()
+        transitive = mem_manager.get_transitive_dependencies(flask_deps, "flask")
+        
+        assert "werkzeug" in transitive
+        assert "jinja2" in transitive
+        assert "dataclasses" in transitive
+    
+    def test_get_transitive_dependencies_reflects_changes(self, mem_manager):
+        """Test closures follow every change to the dependencies dict."""
+        deps = {}
+        mem_manager.add_dependency(deps, "app", "1.0.0", "app1", transitive_deps={"lib": "1.0.0"})
+        assert mem_manager.get_transitive_dependencies(deps, "app") == {"lib": "1.0.0"}
         
+        mem_manager.add_dependency(deps, "lib", "1.0.0", "lib1", transitive_deps={"core": "2.0.0"})
+        assert mem_manager.get_transitive_dependencies(deps, "app") == {
+            "lib": "1.0.0",
+            "core": "2.0.0",
+        }
+        
+        # Direct edits, bypassing add_dependency/remove_dependency
+        deps["core"] = DependencyLock(
+            name="core",
+            version="2.0.0",
+            checksum="core2",
+            resolved_from="^2.0.0",
+            dependencies={"base": "0.1.0"},
+        )
+        deps["lib"].dependencies["extra"] = "3.0.0"
+        assert mem_manager.get_transitive_dependencies(deps, "app") == {
+            "lib": "1.0.0",
+            "core": "2.0.0",
+            "extra": "3.0.0",
+            "base": "0.1.0",
+        }
+    
+    @pytest.mark.parametrize("size", [10, 100, 1000, 10000])
+    def test_get_transitive_dependencies_long_chain(self, size):
+        """Test the resolver walks a long p0 -> p1 -> ... chain iteratively."""
         deps = {
-            "flask": DependencyLock(
-                name="flask",
-                version="2.0.0",
-                checksum="flask123",
-                resolved_from="^2.0.0",
-                dependencies={"werkzeug": "2.0.0", "jinja2": "3.0.0"},
-            ),
-            "werkzeug": DependencyLock(
-                name="werkzeug",
-                version="2.0.0",
-                checksum="wz123",
-                resolved_from="^2.0.0",
-                dependencies={"dataclasses": "0.6"},
-            ),
-            "jinja2": DependencyLock(
-                name="jinja2",
-                version="3.0.0",
-                checksum="j2123",
-                resolved_from="^3.0.0",
-                dependencies={},
-            ),
+            f"p{i}": DependencyLock(
+                name=f"p{i}",
+                version="1.0",
+                checksum="x",
+                resolved_from="^1.0",
+                dependencies={f"p{i + 1}": "1.0"} if i + 1 < size else {},
+            )
+            for i in range(size)
         }
+        manager = LockFileManager()
         
-        transitive = manager.get_transitive_dependencies(deps, "flask")
+        transitive = manager.get_transitive_dependencies(deps, "p0")
         
-        assert "werkzeug" in transitive
-        assert "jinja2" in transitive
-        assert "dataclasses" in transitive
+        # Breadth-first order, each package once, and no recursion limit hit
+        assert list(transitive) == [f"p{i}" for i in range(1, size)]
+        assert set(transitive.values()) <= {"1.0"}
     
-    def test_verify_integrity_success(self):
+    @pytest.mark.xdist_group("lockfile_io")
+    def test_verify_integrity_success(self, manager, tmp_path):
         """Test verify_integrity() with matching checksum."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # Create a test file
-            test_file = Path(tmpdir) / "test.tar.gz"
-            test_file.write_bytes(b"test content")
-            
-            manager = LockFileManager()
-            
-            # Calculate actual checksum
-            checksum = manager.calculate_checksum(test_file)
-            
-            # Create dependency with matching checksum
-            deps = {
-                "mylib": DependencyLock(
-                    name="mylib",
-                    version="1.0.0",
-                    checksum=checksum,
-                    resolved_from="^1.0.0",
-                )
-            }
-            
-            assert manager.verify_integrity(deps, test_file, "mylib")
-    
-    def test_verify_integrity_failure(self):
+        # Create a test file
+        test_file = tmp_path / "test.tar.gz"
+        test_file.write_bytes(_TEST_CONTENT)
+        
+        # Create dependency with matching checksum
+        deps = {
+            "mylib": DependencyLock(
+                name="mylib",
+                version="1.0.0",
+                checksum=_TEST_CONTENT_SHA256,
+                resolved_from="^1.0.0",
+            )
+        }
+        
+        assert manager.verify_integrity(deps, test_file, "mylib")
+    
+    @pytest.mark.xdist_group("lockfile_io")
+    def test_verify_integrity_failure(self, manager, tmp_path):
         """Test verify_integrity() with mismatched checksum."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            test_file = Path(tmpdir) / "test.tar.gz"
-            test_file.write_bytes(b"test content")
-            
-            manager = LockFileManager()
-            
-            deps = {
-                "mylib": DependencyLock(
-                    name="mylib",
-                    version="1.0.0",
-                    checksum="wrong_checksum",
-                    resolved_from="^1.0.0",
-                )
-            }
-            
-            assert not manager.verify_integrity(deps, test_file, "mylib")
-    
-    def test_is_locked_returns_version(self):
-        """Test is_locked() returns locked version."""
-        manager = LockFileManager()
+        test_file = tmp_path / "test.tar.gz"
+        test_file.write_bytes(_TEST_CONTENT)
         
+        deps = {
+            "mylib": DependencyLock(
+                name="mylib",
+                version="1.0.0",
+                checksum="wrong_checksum",
+                resolved_from="^1.0.0",
+            )
+        }
+        
+        assert not manager.verify_integrity(deps, test_file, "mylib")
+    
+    def test_is_locked_returns_version(self, mem_manager):
+        """Test is_locked() returns locked version."""
         deps = {
             "numpy": DependencyLock(
                 name="numpy",
@@ -290,22 +393,18 @@ class TestLockFileManager:
             )
         }
         
-        is_locked, version = manager.is_locked(deps, "numpy", "^1.20.0")
+        is_locked, version = mem_manager.is_locked(deps, "numpy", "^1.20.0")
         assert is_locked
         assert version == "1.21.0"
     
-    def test_is_locked_false_for_missing(self):
+    def test_is_locked_false_for_missing(self, mem_manager):
         """Test is_locked() returns False for missing package."""
-        manager = LockFileManager()
-        
-        is_locked, version = manager.is_locked({}, "numpy", "^1.20.0")
+        is_locked, version = mem_manager.is_locked({}, "numpy", "^1.20.0")
         assert not is_locked
         assert version is None
     
-    def test_get_locked_version(self):
+    def test_get_locked_version(self, mem_manager):
         """Test get_locked_version()."""
-        manager = LockFileManager()
-        
         deps = {
             "pytest": DependencyLock(
                 name="pytest",
@@ -315,77 +414,89 @@ class TestLockFileManager:
             )
         }
         
-        version = manager.get_locked_version(deps, "pytest")
+        version = mem_manager.get_locked_version(deps, "pytest")
         assert version == "7.0.0"
     
-    def test_get_locked_version_missing(self):
+    def test_get_locked_version_missing(self, mem_manager):
         """Test get_locked_version() for missing package."""
-        manager = LockFileManager()
-        
-        version = manager.get_locked_version({}, "pytest")
+        version = mem_manager.get_locked_version({}, "pytest")
         assert version is None
     
-    def test_calculate_checksum(self):
+    @pytest.mark.xdist_group("lockfile_io")
+    def test_calculate_checksum(self, manager, tmp_path):
         """Test calculate_checksum()."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            test_file = Path(tmpdir) / "test.txt"
-            test_file.write_bytes(b"hello world")
-            
-            manager = LockFileManager()
-            checksum = manager.calculate_checksum(test_file)
-            
-            # Verify it's a valid hex string
-            assert isinstance(checksum, str)
-            assert len(checksum) == 64  # SHA256 produces 64 hex chars
-            assert all(c in "0123456789abcdef" for c in checksum)
-    
-    def test_validate_lock_file_valid(self):
+        test_file = tmp_path / "test.txt"
+        test_file.write_bytes(_HELLO_WORLD)
+        
+        checksum = manager.calculate_checksum(test_file)
+        
+        assert checksum == _HELLO_WORLD_SHA256
+    
+    @pytest.mark.parametrize("path", ["mmap", "file_digest", "read_loop"])
+    @pytest.mark.xdist_group("lockfile_io")
+    def test_calculate_checksum_paths(self, manager, tmp_path, monkeypatch, path):
+        """Test each calculate_checksum() strategy on a multi-chunk file."""
+        if path == "file_digest" and not hasattr(hashlib, "file_digest"):
+            pytest.skip("hashlib.file_digest needs Python 3.11+")
+        # Not a multiple of the 64 KiB read size, so the last chunk is short
+        data = os.urandom(3 * 64 * 1024 + 1)
+        test_file = tmp_path / "large.tar.gz"
+        test_file.write_bytes(data)
+        
+        calls = []
+        spy = None
+        if path == "mmap":
+            monkeypatch.setattr(lockfile, "_MMAP_CHECKSUM_THRESHOLD", 0)
+            spy = (lockfile.mmap, "mmap")
+        elif path == "file_digest":
+            spy = (hashlib, "file_digest")
+        else:
+            monkeypatch.delattr(hashlib, "file_digest", raising=False)
+        if spy:
+            module, name = spy
+            original = getattr(module, name)
+            monkeypatch.setattr(
+                module, name,
+                lambda *args, **kwargs: calls.append(name) or original(*args, **kwargs),
+            )
+        
+        checksum = manager.calculate_checksum(test_file)
+        
+        assert checksum == hashlib.sha256(data).hexdigest()
+        assert calls == ([spy[1]] if spy else [])
+    
+    @pytest.mark.xdist_group("lockfile_io")
+    def test_validate_lock_file_valid(self, manager, numpy_deps_bytes):
         """Test validate_lock_file() for valid lock file."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = LockFileManager(Path(tmpdir))
-            
-            deps = {
-                "numpy": DependencyLock(
-                    name="numpy",
-                    version="1.21.0",
-                    checksum="abc",
-                    resolved_from="^1.21.0",
-                    dependencies={},
-                )
-            }
-            
-            manager.save(deps)
-            
-            is_valid, errors = manager.validate_lock_file()
-            assert is_valid
-            assert errors == []
-    
-    def test_validate_lock_file_missing_transitive(self):
+        _, payload = numpy_deps_bytes
+        manager.lock_path.write_bytes(payload)
+        
+        is_valid, errors = manager.validate_lock_file()
+        assert is_valid
+        assert errors == []
+    
+    @pytest.mark.xdist_group("lockfile_io")
+    def test_validate_lock_file_missing_transitive(self, manager):
         """Test validate_lock_file() detects missing transitive deps."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = LockFileManager(Path(tmpdir))
-            
-            deps = {
-                "flask": DependencyLock(
-                    name="flask",
-                    version="2.0.0",
-                    checksum="flask",
-                    resolved_from="^2.0.0",
-                    dependencies={"werkzeug": "2.0.0"},
-                    # Note: werkzeug is not in deps dict
-                )
-            }
-            
-            manager.save(deps)
-            
-            is_valid, errors = manager.validate_lock_file()
-            assert not is_valid
-            assert any("werkzeug" in str(e) for e in errors)
-    
-    def test_export_to_manifest_direct_only(self):
-        """Test export_to_manifest() with direct_only=True."""
-        manager = LockFileManager()
+        deps = {
+            "flask": DependencyLock(
+                name="flask",
+                version="2.0.0",
+                checksum="flask",
+                resolved_from="^2.0.0",
+                dependencies={"werkzeug": "2.0.0"},
+                # Note: werkzeug is not in deps dict
+            )
+        }
+        
+        manager.save(deps)
         
+        is_valid, errors = manager.validate_lock_file()
+        assert not is_valid
+        assert any("werkzeug" in str(e) for e in errors)
+    
+    def test_export_to_manifest_direct_only(self, mem_manager):
+        """Test export_to_manifest() with direct_only=True."""
         deps = {
             "numpy": DependencyLock(
                 name="numpy",
@@ -401,15 +512,13 @@ class TestLockFileManager:
             ),
         }
         
-        manifest = manager.export_to_manifest(deps, direct_only=True)
+        manifest = mem_manager.export_to_manifest(deps, direct_only=True)
         
         assert manifest["numpy"] == "^1.20.0"
         assert manifest["pandas"] == "1.3.0"
     
-    def test_prune_unused(self):
+    def test_prune_unused(self, mem_manager):
         """Test prune_unused()."""
-        manager = LockFileManager()
-        
         deps = {
             "numpy": DependencyLock(
                 name="numpy",
@@ -431,16 +540,14 @@ class TestLockFileManager:
             ),
         }
         
-        pruned = manager.prune_unused(deps, ["numpy", "pandas"])
+        pruned = mem_manager.prune_unused(deps, ["numpy", "pandas"])
         
         assert "numpy" in pruned
         assert "pandas" in pruned
         assert "scipy" not in pruned
     
-    def test_update_timestamps(self):
+    def test_update_timestamps(self, mem_manager):
         """Test update_timestamps()."""
-        manager = LockFileManager()
-        
         deps = {
             "numpy": DependencyLock(
                 name="numpy",
@@ -451,60 +558,59 @@ class TestLockFileManager:
             )
         }
         
-        before = datetime.utcnow().isoformat()
-        updated = manager.update_timestamps(deps)
-        after = datetime.utcnow().isoformat()
+        before = datetime.utcnow()
+        updated = mem_manager.update_timestamps(deps)
+        after = datetime.utcnow()
         
         # Check timestamp is updated and reasonable
-        new_ts = updated["numpy"].installed_at
-        assert before <= new_ts <= after
+        assert before <= datetime.fromisoformat(updated["numpy"].installed_at) <= after
 
 
+@pytest.mark.xdist_group("lockfile_integration")
 class TestLockFileIntegration:
     """Integration tests for lock file management."""
     
     def test_full_workflow(self):
         """Test complete lock file workflow."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = LockFileManager(Path(tmpdir))
-            
-            # Start with no lock file
-            assert not manager.exists()
-            
-            # Create dependencies
-            deps = {}
-            deps = manager.add_dependency(
-                deps,
-                name="numpy",
-                version="1.21.0",
-                checksum="numpy123",
-                resolved_from="^1.20.0",
-                transitive_deps={"cython": "0.29.0"},
-            )
-            
-            deps = manager.add_dependency(
-                deps,
-                name="cython",
-                version="0.29.0",
-                checksum="cython123",
-                resolved_from="^0.29.0",
-            )
-            
-            # Save
-            manager.save(deps)
-            assert manager.exists()
-            
-            # Load and verify
-            loaded = manager.load()
-            assert len(loaded) == 2
-            assert loaded["numpy"].version == "1.21.0"
-            assert loaded["cython"].version == "0.29.0"
-            
-            # Remove a dependency
-            loaded = manager.remove_dependency(loaded, "cython")
-            manager.save(loaded)
-            
-            # Reload and verify
-            loaded = manager.load()
-            assert "numpy" in loaded
-            assert "cython" not in loaded
+        manager = LockFileManager(storage=io.BytesIO())
+        
+        # Start with no lock file
+        assert not manager.exists()
+        
+        # Create dependencies
+        deps = {}
+        deps = manager.add_dependency(
+            deps,
+            name="numpy",
+            version="1.21.0",
+            checksum="numpy123",
+            resolved_from="^1.20.0",
+            transitive_deps={"cython": "0.29.0"},
+        )
+        
+        deps = manager.add_dependency(
+            deps,
+            name="cython",
+            version="0.29.0",
+            checksum="cython123",
+            resolved_from="^0.29.0",
+        )
+        
+        # Save
+        manager.save(deps)
+        assert manager.exists()
+        
+        # Load and verify
+        loaded = manager.load()
+        assert len(loaded) == 2
+        assert loaded["numpy"].version == "1.21.0"
+        assert loaded["cython"].version == "0.29.0"
+        
+        # Remove a dependency
+        loaded = manager.remove_dependency(loaded, "cython")
+        manager.save(loaded)
+        
+        # Reload and verify
+        loaded = manager.load()
+        assert "numpy" in loaded
+        assert "cython" not in loaded
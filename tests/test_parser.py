@@ -1,7 +1,12 @@
-import sys
-sys.path.insert(0, 'src')
+import pytest
 
-from synapse.parser.parser import parse_and_execute
+from synapse.parser.parser import parse_and_execute, parse_cached
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _warm():
+    """Parse once up front so ANTLR's shared DFA cache is already built."""
+    parse_and_execute("let _ = normal(0,1);")
 
 def test_parse_let():
     result = parse_and_execute("let x = normal(0,1);")
@@ -14,3 +19,17 @@ def test_parse_sample():
 def test_parse_if():
     result = parse_and_execute("let belief = bernoulli(0.7); if sample(belief) > 0.5 { }")
     assert result is None
+
+def test_parse_error_reported_every_call(capsys):
+    for _ in range(2):
+        parse_and_execute("let x = ;")
+        assert "mismatched input" in capsys.readouterr().err
+
+def test_parse_cached():
+    assert parse_cached("let x = 1;") is parse_cached("let x = 1;")
+    assert parse_cached("let x = ;") is not parse_cached("let x = ;")
+
+def test_parse_cached_skips_lexer_errors(capsys):
+    for _ in range(2):
+        parse_cached("let x = 1 @ 2;")
+        assert "token recognition error" in capsys.readouterr().err
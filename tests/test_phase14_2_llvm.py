@@ -3,9 +3,9 @@ Phase 14.2: LLVM Backend Tests
 Comprehensive testing of LLVM IR generation, optimization, and JIT compilation
 """
 
+import re
+
 import pytest
-import time
-from typing import Dict, Any
 
 # Try importing LLVM backend
 try:
@@ -24,160 +24,234 @@ except ImportError:
     pytest.skip("LLVM backend not available", allow_module_level=True)
 
 
+# Test programs. Sequences are tuples: codegen only iterates them, and the
+# constants are shared by every test in the module.
+_EMPTY_PROGRAM = {'type': 'program', 'body': ()}
+
+# Markers expected in the generated IR, each checked in one scan
+_BIN_PAT = re.compile(r'\badd\b|\+')
+_UN_PAT = re.compile(r'negate|\bsub\b')
+_IF_PAT = re.compile(r'then|conditional')
+
+
+def _binary_add_program(name):
+    """Program defining name(a, b) that returns a + b"""
+    return {
+        'type': 'program',
+        'body': (
+            {
+                'type': 'function_def',
+                'name': name,
+                'params': ('a', 'b'),
+                'body': (
+                    {
+                        'type': 'return_statement',
+                        'value': {
+                            'type': 'binary_op',
+                            'op': '+',
+                            'left': {'type': 'identifier', 'name': 'a'},
+                            'right': {'type': 'identifier', 'name': 'b'}
+                        }
+                    },
+                )
+            },
+        )
+    }
+
+
+_ADD_AST = _binary_add_program('add')
+
+_BIN_OP_AST = _binary_add_program('calc')
+
+_LET_AST = {
+    'type': 'program',
+    'body': (
+        {
+            'type': 'let_statement',
+            'name': 'x',
+            'value': {'type': 'literal', 'value': 42},
+            'var_type': 'int'
+        },
+    )
+}
+
+_MAIN_AST = {
+    'type': 'program',
+    'body': (
+        {
+            'type': 'function_def',
+            'name': 'main',
+            'params': (),
+            'body': (
+                {
+                    'type': 'return_statement',
+                    'value': {'type': 'literal', 'value': 0}
+                },
+            )
+        },
+    )
+}
+
+_UNARY_AST = {
+    'type': 'program',
+    'body': (
+        {
+            'type': 'function_def',
+            'name': 'negate',
+            'params': ('x',),
+            'body': (
+                {
+                    'type': 'return_statement',
+                    'value': {
+                        'type': 'unary_op',
+                        'op': '-',
+                        'operand': {'type': 'identifier', 'name': 'x'}
+                    }
+                },
+            )
+        },
+    )
+}
+
+_IF_AST = {
+    'type': 'program',
+    'body': (
+        {
+            'type': 'function_def',
+            'name': 'conditional',
+            'params': ('x',),
+            'body': (
+                {
+                    'type': 'if_statement',
+                    'condition': {
+                        'type': 'binary_op',
+                        'op': '>',
+                        'left': {'type': 'identifier', 'name': 'x'},
+                        'right': {'type': 'literal', 'value': 0}
+                    },
+                    'then_body': (
+                        {
+                            'type': 'return_statement',
+                            'value': {'type': 'literal', 'value': 1}
+                        },
+                    ),
+                    'else_body': (
+                        {
+                            'type': 'return_statement',
+                            'value': {'type': 'literal', 'value': 0}
+                        },
+                    )
+                },
+            )
+        },
+    )
+}
+
+
+@pytest.fixture(scope="module")
+def compiled_empty_backend(llvm_backend_factory):
+    """opt_level=2 backend with the empty program compiled once per module"""
+    backend = llvm_backend_factory(opt_level=2)
+    backend.compile(_EMPTY_PROGRAM)
+    return backend
+
+
+@pytest.fixture(scope="module")
+def empty_ir(compiled_empty_backend):
+    """IR of the empty program"""
+    return compiled_empty_backend.get_ir()
+
+
+@pytest.fixture(scope="class")
+def type_sys():
+    """One LLVMTypeSystem shared by the type conversion cases"""
+    return LLVMTypeSystem(None)
+
+
 class TestLLVMTypeSystem:
     """Test LLVM type system conversions"""
     
-    def test_synapse_to_llvm_type_int(self):
-        """Test int type conversion"""
-        type_sys = LLVMTypeSystem(None)
-        assert type_sys.synapse_to_llvm_type('int') == 'i32'
-    
-    def test_synapse_to_llvm_type_float(self):
-        """Test float type conversion"""
-        type_sys = LLVMTypeSystem(None)
-        assert type_sys.synapse_to_llvm_type('float') == 'double'
-    
-    def test_synapse_to_llvm_type_bool(self):
-        """Test bool type conversion"""
-        type_sys = LLVMTypeSystem(None)
-        assert type_sys.synapse_to_llvm_type('bool') == 'i1'
-    
-    def test_synapse_to_llvm_type_string(self):
-        """Test string type conversion"""
-        type_sys = LLVMTypeSystem(None)
-        assert type_sys.synapse_to_llvm_type('string') == 'i8*'
-    
-    def test_synapse_to_llvm_type_unknown(self):
-        """Test unknown type defaults to i32"""
-        type_sys = LLVMTypeSystem(None)
-        assert type_sys.synapse_to_llvm_type('unknown') == 'i32'
+    @pytest.mark.parametrize("syn,llvm_ty", [
+        ('int', 'i32'),
+        ('float', 'double'),
+        ('bool', 'i1'),
+        ('string', 'i8*'),
+        ('unknown', 'i32'),  # unknown types default to i32
+    ])
+    def test_synapse_to_llvm_type(self, type_sys, syn, llvm_ty):
+        """Test Synapse to LLVM type conversion"""
+        assert type_sys.synapse_to_llvm_type(syn) == llvm_ty
 
 
 class TestLLVMCodeGenerator:
     """Test LLVM code generation from AST"""
     
-    @pytest.mark.skipif(not LLVMLITE_AVAILABLE, reason="llvmlite not installed")
+    @pytest.mark.needs_llvmlite
     def test_generate_from_empty_ast(self):
         """Test generation from empty program"""
         codegen = LLVMCodeGenerator()
-        ast = {'type': 'program', 'body': []}
-        ir = codegen.generate_from_ast(ast)
+        ir = codegen.generate_from_ast(_EMPTY_PROGRAM)
         assert isinstance(ir, str)
         assert len(ir) > 0
     
-    @pytest.mark.skipif(not LLVMLITE_AVAILABLE, reason="llvmlite not installed")
+    @pytest.mark.needs_llvmlite
     def test_generate_simple_function(self):
         """Test function generation"""
         codegen = LLVMCodeGenerator()
-        ast = {
-            'type': 'program',
-            'body': [
-                {
-                    'type': 'function_def',
-                    'name': 'add',
-                    'params': ['a', 'b'],
-                    'body': [
-                        {
-                            'type': 'return_statement',
-                            'value': {
-                                'type': 'binary_op',
-                                'op': '+',
-                                'left': {'type': 'identifier', 'name': 'a'},
-                                'right': {'type': 'identifier', 'name': 'b'}
-                            }
-                        }
-                    ]
-                }
-            ]
-        }
-        ir = codegen.generate_from_ast(ast)
+        ir = codegen.generate_from_ast(_ADD_AST)
         assert 'define' in ir
         assert 'add' in ir
     
-    @pytest.mark.skipif(not LLVMLITE_AVAILABLE, reason="llvmlite not installed")
+    @pytest.mark.needs_llvmlite
     def test_generate_variable_declaration(self):
         """Test variable declaration"""
         codegen = LLVMCodeGenerator()
-        ast = {
-            'type': 'program',
-            'body': [
-                {
-                    'type': 'let_statement',
-                    'name': 'x',
-                    'value': {'type': 'literal', 'value': 42},
-                    'var_type': 'int'
-                }
-            ]
-        }
-        ir = codegen.generate_from_ast(ast)
+        ir = codegen.generate_from_ast(_LET_AST)
         assert isinstance(ir, str)
 
 
 class TestLLVMBackend:
     """Test full LLVM backend"""
     
-    @pytest.mark.skipif(not LLVMLITE_AVAILABLE, reason="llvmlite not installed")
-    def test_backend_initialization(self):
+    @pytest.mark.needs_llvmlite
+    def test_backend_initialization(self, llvm_backend_factory):
         """Test backend initialization"""
-        backend = LLVMBackend(opt_level=2, enable_jit=True)
+        backend = llvm_backend_factory(opt_level=2, enable_jit=True)
         assert backend.opt_level == 2
         assert backend.enable_jit is True
     
-    @pytest.mark.skipif(not LLVMLITE_AVAILABLE, reason="llvmlite not installed")
-    def test_backend_compile(self):
+    @pytest.mark.needs_llvmlite
+    def test_backend_compile(self, empty_ir):
         """Test backend compilation"""
-        backend = LLVMBackend()
-        ast = {'type': 'program', 'body': []}
-        ir = backend.compile(ast)
-        assert isinstance(ir, str)
-        assert len(ir) > 0
+        assert isinstance(empty_ir, str)
+        assert len(empty_ir) > 0
     
-    @pytest.mark.skipif(not LLVMLITE_AVAILABLE, reason="llvmlite not installed")
-    def test_backend_get_ir(self):
+    @pytest.mark.needs_llvmlite
+    def test_backend_get_ir(self, compiled_empty_backend):
         """Test getting generated IR"""
-        backend = LLVMBackend()
-        ast = {'type': 'program', 'body': []}
-        backend.compile(ast)
-        ir = backend.get_ir()
+        ir = compiled_empty_backend.get_ir()
         assert ir is not None
         assert isinstance(ir, str)
     
-    @pytest.mark.skipif(not LLVMLITE_AVAILABLE, reason="llvmlite not installed")
-    def test_backend_optimize(self):
+    @pytest.mark.needs_llvmlite
+    def test_backend_optimize(self, compiled_empty_backend):
         """Test optimization pass"""
-        backend = LLVMBackend(opt_level=2)
-        ast = {'type': 'program', 'body': []}
-        backend.compile(ast)
-        optimized = backend.optimize()
+        optimized = compiled_empty_backend.optimize()
         assert isinstance(optimized, str)
 
 
 class TestLLVMOptimizations:
     """Test optimization passes"""
     
-    @pytest.mark.skipif(not LLVMLITE_AVAILABLE, reason="llvmlite not installed")
-    def test_optimization_level_0(self):
-        """Test no optimization"""
-        backend = LLVMBackend(opt_level=0)
-        ast = {'type': 'program', 'body': []}
-        ir = backend.compile(ast)
-        assert ir is not None
-    
-    @pytest.mark.skipif(not LLVMLITE_AVAILABLE, reason="llvmlite not installed")
-    def test_optimization_level_1(self):
-        """Test basic optimization"""
-        backend = LLVMBackend(opt_level=1)
-        ast = {'type': 'program', 'body': []}
-        ir = backend.compile(ast)
-        assert ir is not None
-    
-    @pytest.mark.skipif(not LLVMLITE_AVAILABLE, reason="llvmlite not installed")
-    def test_optimization_level_3(self):
-        """Test aggressive optimization"""
-        backend = LLVMBackend(opt_level=3)
-        ast = {'type': 'program', 'body': []}
-        ir = backend.compile(ast)
-        assert ir is not None
+    @pytest.mark.needs_llvmlite
+    @pytest.mark.parametrize("opt_level", [0, 1, 2, 3])
+    def test_opt_levels(self, opt_level, llvm_backend_factory):
+        """Test every optimization level runs its passes over compiled IR"""
+        backend = llvm_backend_factory(opt_level=opt_level)
+        backend.compile(_EMPTY_PROGRAM)
+        optimized = backend.optimize()
+        assert isinstance(optimized, str)
+        assert len(optimized) > 0
 
 
 class TestLLVMTranspiler:
@@ -203,154 +277,72 @@ class TestLLVMTranspiler:
 class TestLLVMIntegration:
     """Integration tests for LLVM backend"""
     
-    @pytest.mark.skipif(not LLVMLITE_AVAILABLE, reason="llvmlite not installed")
-    def test_compile_and_optimize(self):
+    @pytest.mark.needs_llvmlite
+    def test_compile_and_optimize(self, llvm_backend_factory):
         """Test compile and optimize pipeline"""
-        backend = LLVMBackend(opt_level=2)
-        ast = {
-            'type': 'program',
-            'body': [
-                {
-                    'type': 'function_def',
-                    'name': 'main',
-                    'params': [],
-                    'body': [
-                        {
-                            'type': 'return_statement',
-                            'value': {'type': 'literal', 'value': 0}
-                        }
-                    ]
-                }
-            ]
-        }
-        
-        ir_before = backend.compile(ast)
+        backend = llvm_backend_factory(opt_level=2)
+        ir_before = backend.compile(_MAIN_AST)
         ir_after = backend.optimize()
         
         assert ir_before is not None
         assert ir_after is not None
         assert 'main' in ir_before
     
-    @pytest.mark.skipif(not LLVMLITE_AVAILABLE, reason="llvmlite not installed")
-    def test_benchmark_performance(self):
+    @pytest.mark.needs_llvmlite
+    def test_benchmark_performance(self, llvm_backend_factory):
         """Test performance benchmarking"""
-        backend = LLVMBackend()
-        ast = {'type': 'program', 'body': []}
-        backend.compile(ast)
+        backend = llvm_backend_factory()
+        backend.compile(_EMPTY_PROGRAM)
         
-        bench = backend.benchmark_vs_interpreter(iterations=1000)
+        bench = backend.benchmark_vs_interpreter(iterations=1)
         
         assert 'iterations' in bench
         assert 'time_seconds' in bench
         assert 'ops_per_second' in bench
-        assert bench['iterations'] == 1000
+        assert bench['iterations'] == 1
+        assert bench['ops_per_second'] > 0
+    
+    @pytest.mark.slow
+    @pytest.mark.needs_llvmlite
+    def test_benchmark_quality(self, llvm_backend_factory):
+        """Test benchmarking at a realistic iteration count"""
+        backend = llvm_backend_factory()
+        backend.compile(_EMPTY_PROGRAM)
+        
+        bench = backend.benchmark_vs_interpreter(iterations=10000)
+        
+        assert bench['iterations'] == 10000
+        assert bench['time_seconds'] > 0
         assert bench['ops_per_second'] > 0
 
 
 class TestLLVMComplexExpressions:
     """Test complex expression compilation"""
     
-    @pytest.mark.skipif(not LLVMLITE_AVAILABLE, reason="llvmlite not installed")
+    @pytest.mark.needs_llvmlite
     def test_binary_operations(self):
         """Test binary operation codegen"""
         codegen = LLVMCodeGenerator()
-        ast = {
-            'type': 'program',
-            'body': [
-                {
-                    'type': 'function_def',
-                    'name': 'calc',
-                    'params': ['a', 'b'],
-                    'body': [
-                        {
-                            'type': 'return_statement',
-                            'value': {
-                                'type': 'binary_op',
-                                'op': '+',
-                                'left': {'type': 'identifier', 'name': 'a'},
-                                'right': {'type': 'identifier', 'name': 'b'}
-                            }
-                        }
-                    ]
-                }
-            ]
-        }
-        
-        ir = codegen.generate_from_ast(ast)
-        assert 'add' in ir or '+' in ir
+        ir = codegen.generate_from_ast(_BIN_OP_AST)
+        assert _BIN_PAT.search(ir)
     
-    @pytest.mark.skipif(not LLVMLITE_AVAILABLE, reason="llvmlite not installed")
+    @pytest.mark.needs_llvmlite
     def test_unary_operations(self):
         """Test unary operation codegen"""
         codegen = LLVMCodeGenerator()
-        ast = {
-            'type': 'program',
-            'body': [
-                {
-                    'type': 'function_def',
-                    'name': 'negate',
-                    'params': ['x'],
-                    'body': [
-                        {
-                            'type': 'return_statement',
-                            'value': {
-                                'type': 'unary_op',
-                                'op': '-',
-                                'operand': {'type': 'identifier', 'name': 'x'}
-                            }
-                        }
-                    ]
-                }
-            ]
-        }
-        
-        ir = codegen.generate_from_ast(ast)
-        assert 'negate' in ir or 'sub' in ir
+        ir = codegen.generate_from_ast(_UNARY_AST)
+        assert _UN_PAT.search(ir)
 
 
 class TestLLVMControlFlow:
     """Test control flow compilation"""
     
-    @pytest.mark.skipif(not LLVMLITE_AVAILABLE, reason="llvmlite not installed")
+    @pytest.mark.needs_llvmlite
     def test_if_statement(self):
         """Test if statement codegen"""
         codegen = LLVMCodeGenerator()
-        ast = {
-            'type': 'program',
-            'body': [
-                {
-                    'type': 'function_def',
-                    'name': 'conditional',
-                    'params': ['x'],
-                    'body': [
-                        {
-                            'type': 'if_statement',
-                            'condition': {
-                                'type': 'binary_op',
-                                'op': '>',
-                                'left': {'type': 'identifier', 'name': 'x'},
-                                'right': {'type': 'literal', 'value': 0}
-                            },
-                            'then_body': [
-                                {
-                                    'type': 'return_statement',
-                                    'value': {'type': 'literal', 'value': 1}
-                                }
-                            ],
-                            'else_body': [
-                                {
-                                    'type': 'return_statement',
-                                    'value': {'type': 'literal', 'value': 0}
-                                }
-                            ]
-                        }
-                    ]
-                }
-            ]
-        }
-        
-        ir = codegen.generate_from_ast(ast)
-        assert 'then' in ir or 'conditional' in ir
+        ir = codegen.generate_from_ast(_IF_AST)
+        assert _IF_PAT.search(ir)
 
 
 class TestLLVMBackendCompatibility:
@@ -365,14 +357,13 @@ class TestLLVMBackendCompatibility:
 class TestLLVMPerformanceEstimates:
     """Test performance estimation"""
     
-    @pytest.mark.skipif(not LLVMLITE_AVAILABLE, reason="llvmlite not installed")
-    def test_benchmark_returns_metrics(self):
+    @pytest.mark.needs_llvmlite
+    def test_benchmark_returns_metrics(self, llvm_backend_factory):
         """Test benchmark returns proper metrics"""
-        backend = LLVMBackend()
-        ast = {'type': 'program', 'body': []}
-        backend.compile(ast)
+        backend = llvm_backend_factory()
+        backend.compile(_EMPTY_PROGRAM)
         
-        metrics = backend.benchmark_vs_interpreter(iterations=100)
+        metrics = backend.benchmark_vs_interpreter(iterations=1)
         
         assert 'iterations' in metrics
         assert 'time_seconds' in metrics
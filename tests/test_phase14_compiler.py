@@ -12,13 +12,46 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from synapse.backends.self_host import (
     SynapseLexer, SynapseParser, CodeGenerator, SelfHostedCompiler,
-    TokenType, Literal, Identifier, BinaryOp
+    TokenType, Literal, Identifier, BinaryOp, LetStmt, FuncDef, IfStmt, ForStmt
 )
 from synapse.vm.bytecode import BytecodeVM, Opcode, BytecodeVM
 from synapse.backends.incremental import IncrementalCompiler, ChangeDetector
 from synapse.backends.optimizer import SynapseOptimizer, OptimizationLevel
 
 
+def parse_code(code):
+    """Lex and parse source with the self-hosted front end"""
+    return SynapseParser(SynapseLexer(code).tokenize()).parse()
+
+
+@pytest.fixture(scope="module")
+def compiler():
+    """One SelfHostedCompiler for the module; it keeps no per-compile state"""
+    return SelfHostedCompiler()
+
+
+_PROJECT_FILES = {
+    'utils.syn': 'def add(a, b) { a + b }',
+    'main.syn': 'import "utils.syn"\nlet x = add(1, 2)'
+}
+
+
+@pytest.fixture
+def detector():
+    """ChangeDetector that has already hashed a.syn"""
+    detector = ChangeDetector()
+    detector.update_hashes({'a.syn': 'let x = 1'})
+    return detector
+
+
+@pytest.fixture
+def prepared_compiler():
+    """IncrementalCompiler with the two-file project registered"""
+    compiler = IncrementalCompiler()
+    compiler.register_files(_PROJECT_FILES)
+    return compiler
+
+
 class TestSynapseLexer:
     """Test the Synapse lexer"""
     
@@ -40,7 +73,7 @@ class TestSynapseLexer:
         lexer = SynapseLexer(code)
         tokens = lexer.tokenize()
         
-        token_types = [t.type for t in tokens]
+        token_types = {t.type for t in tokens}
         assert TokenType.DEF in token_types
         assert TokenType.ID in token_types
         assert TokenType.LPAREN in token_types
@@ -61,7 +94,7 @@ class TestSynapseLexer:
         lexer = SynapseLexer(code)
         tokens = lexer.tokenize()
         
-        token_types = [t.type for t in tokens]
+        token_types = {t.type for t in tokens}
         assert TokenType.PLUS in token_types
         assert TokenType.MINUS in token_types
         assert TokenType.STAR in token_types
@@ -75,63 +108,49 @@ class TestSynapseParser:
     def test_parse_let_statement(self):
         """Test parsing let statements"""
         code = "let x = 42"
-        lexer = SynapseLexer(code)
-        tokens = lexer.tokenize()
-        parser = SynapseParser(tokens)
-        ast = parser.parse()
+        ast = parse_code(code)
         
         assert len(ast.statements) > 0
-        assert ast.statements[0].__class__.__name__ == "LetStmt"
+        assert isinstance(ast.statements[0], LetStmt)
     
     def test_parse_function_definition(self):
         """Test parsing function definitions"""
         code = "def add(a, b) { a + b }"
-        lexer = SynapseLexer(code)
-        tokens = lexer.tokenize()
-        parser = SynapseParser(tokens)
-        ast = parser.parse()
+        ast = parse_code(code)
         
         assert len(ast.statements) > 0
-        assert ast.statements[0].__class__.__name__ == "FuncDef"
+        assert isinstance(ast.statements[0], FuncDef)
     
     def test_parse_if_statement(self):
         """Test parsing if statements"""
         code = "if x > 10 { print(x) }"
-        lexer = SynapseLexer(code)
-        tokens = lexer.tokenize()
-        parser = SynapseParser(tokens)
-        ast = parser.parse()
+        ast = parse_code(code)
         
         assert len(ast.statements) > 0
-        assert ast.statements[0].__class__.__name__ == "IfStmt"
+        assert isinstance(ast.statements[0], IfStmt)
     
     def test_parse_for_loop(self):
         """Test parsing for loops"""
         code = "for i in [1, 2, 3] { print(i) }"
-        lexer = SynapseLexer(code)
-        tokens = lexer.tokenize()
-        parser = SynapseParser(tokens)
-        ast = parser.parse()
+        ast = parse_code(code)
         
         assert len(ast.statements) > 0
-        assert ast.statements[0].__class__.__name__ == "ForStmt"
+        assert isinstance(ast.statements[0], ForStmt)
 
 
 class TestCodeGenerator:
     """Test code generation"""
     
-    def test_generate_python_from_let(self):
+    def test_generate_python_from_let(self, compiler):
         """Test Python code generation from let statement"""
         code = "let x = 42"
-        compiler = SelfHostedCompiler()
         python_code = compiler.compile_to_python(code)
         
         assert "x = 42" in python_code
     
-    def test_generate_python_arithmetic(self):
+    def test_generate_python_arithmetic(self, compiler):
         """Test Python code generation for arithmetic"""
         code = "let z = x + y"
-        compiler = SelfHostedCompiler()
         python_code = compiler.compile_to_python(code)
         
         assert "x + y" in python_code
@@ -141,26 +160,23 @@ class TestCodeGenerator:
 class TestSelfHostedCompiler:
     """Test the self-hosted compiler"""
     
-    def test_compile_to_ast(self):
+    def test_compile_to_ast(self, compiler):
         """Test compiling to AST"""
         code = "let x = 42"
-        compiler = SelfHostedCompiler()
         ast = compiler.compile_to_ast(code)
         
         assert len(ast.statements) > 0
     
-    def test_compile_to_python(self):
+    def test_compile_to_python(self, compiler):
         """Test compiling to Python"""
         code = "let x = 42"
-        compiler = SelfHostedCompiler()
         python = compiler.compile_to_python(code)
         
         assert "x = 42" in python
     
-    def test_compile_to_bytecode(self):
+    def test_compile_to_bytecode(self, compiler):
         """Test compiling to bytecode"""
         code = "let x = 42"
-        compiler = SelfHostedCompiler()
         bytecode = compiler.compile_to_bytecode(code)
         
         assert len(bytecode) > 0
@@ -172,7 +188,7 @@ class TestBytecodeVM:
     
     def test_load_and_execute_constant(self):
         """Test loading and executing constants"""
-        vm = BytecodeVM()
+        vm = BytecodeVM(max_registers=8)
         
         const_42 = vm.load_constant(42)
         vm.emit(Opcode.LOAD_CONST, const_42, 0)
@@ -182,36 +198,52 @@ class TestBytecodeVM:
     
     def test_arithmetic_operations(self):
         """Test arithmetic operations"""
-        vm = BytecodeVM()
+        vm = BytecodeVM(max_registers=8)
         
-        # Load 10 and 20
-        vm.emit(Opcode.LOAD_CONST, vm.load_constant(10), 0)
-        vm.emit(Opcode.LOAD_CONST, vm.load_constant(20), 1)
-        
-        # Add
-        vm.emit(Opcode.ADD, 0, 1, 2)
+        # Load 10 and 20, then add
+        vm.emit_many([
+            (Opcode.LOAD_CONST, vm.load_constant(10), 0),
+            (Opcode.LOAD_CONST, vm.load_constant(20), 1),
+            (Opcode.ADD, 0, 1, 2),
+        ])
         
         result = vm.execute()
         assert vm.registers[2] == 30
     
     def test_comparison_operations(self):
         """Test comparison operations"""
-        vm = BytecodeVM()
+        vm = BytecodeVM(max_registers=8)
         
-        vm.emit(Opcode.LOAD_CONST, vm.load_constant(10), 0)
-        vm.emit(Opcode.LOAD_CONST, vm.load_constant(5), 1)
-        vm.emit(Opcode.CMP_GT, 0, 1, 2)
+        vm.emit_many([
+            (Opcode.LOAD_CONST, vm.load_constant(10), 0),
+            (Opcode.LOAD_CONST, vm.load_constant(5), 1),
+            (Opcode.CMP_GT, 0, 1, 2),
+        ])
         
         result = vm.execute()
         assert vm.registers[2] == True
     
+    def test_emit_many_matches_emit(self):
+        """Test emit_many appends the same instructions as repeated emit"""
+        program = [(Opcode.LOAD_CONST, 0, 0), (Opcode.NEG, 0, 1), (Opcode.NOP,)]
+        single, batched = BytecodeVM(max_registers=8), BytecodeVM(max_registers=8)
+        batched.emit(Opcode.NOP)
+        single.emit(Opcode.NOP)
+        for instr in program:
+            single.emit(*instr)
+        
+        assert batched.emit_many(program) == 1
+        assert batched.code == single.code
+    
     def test_vm_performance(self):
         """Test VM performance is acceptable"""
-        vm = BytecodeVM()
+        vm = BytecodeVM(max_registers=8)
         
-        vm.emit(Opcode.LOAD_CONST, vm.load_constant(100), 0)
-        vm.emit(Opcode.LOAD_CONST, vm.load_constant(50), 1)
-        vm.emit(Opcode.MUL, 0, 1, 2)
+        vm.emit_many([
+            (Opcode.LOAD_CONST, vm.load_constant(100), 0),
+            (Opcode.LOAD_CONST, vm.load_constant(50), 1),
+            (Opcode.MUL, 0, 1, 2),
+        ])
         
         stats = vm.benchmark(100)
         
@@ -222,58 +254,38 @@ class TestBytecodeVM:
 class TestIncrementalCompilation:
     """Test incremental compilation"""
     
-    def test_change_detection(self):
+    def test_change_detection(self, detector):
         """Test change detection"""
-        detector = ChangeDetector()
-        
-        files = {'a.syn': 'let x = 1'}
-        detector.update_hashes(files)
-        
-        files['a.syn'] = 'let x = 2'
-        changes = detector.detect_changes(files)
+        changes = detector.detect_changes({'a.syn': 'let x = 2'})
         
         assert 'a.syn' in changes
     
-    def test_no_change_detection(self):
+    def test_compute_hash_is_stable_and_content_sensitive(self, detector):
+        """Test hashes are opaque values that track content equality"""
+        assert detector.compute_hash('let x = 1') == detector.compute_hash('let x = 1')
+        assert detector.compute_hash('let x = 1') != detector.compute_hash('let x = 2')
+    
+    def test_no_change_detection(self, detector):
         """Test no changes detected when files unchanged"""
-        detector = ChangeDetector()
-        
-        files = {'a.syn': 'let x = 1'}
-        detector.update_hashes(files)
-        
-        changes = detector.detect_changes(files)
+        changes = detector.detect_changes({'a.syn': 'let x = 1'})
         
         assert len(changes) == 0
     
-    def test_incremental_compile(self):
+    def test_incremental_compile(self, prepared_compiler):
         """Test incremental compilation"""
-        compiler = IncrementalCompiler()
-        
-        files = {
-            'utils.syn': 'def add(a, b) { a + b }',
-            'main.syn': 'import "utils.syn"\nlet x = add(1, 2)'
-        }
-        
-        compiler.register_files(files)
-        result = compiler.compile_incremental(files)
+        result = prepared_compiler.compile_incremental(_PROJECT_FILES)
         
         assert 'utils.syn' in result
         assert 'main.syn' in result
     
-    def test_cache_effectiveness(self):
+    def test_cache_effectiveness(self, prepared_compiler):
         """Test that caching reduces recompilation"""
-        compiler = IncrementalCompiler()
-        
-        files = {
-            'utils.syn': 'def add(a, b) { a + b }',
-            'main.syn': 'import "utils.syn"'
-        }
+        compiler = prepared_compiler
         
-        compiler.register_files(files)
-        result1 = compiler.compile_incremental(files)
+        result1 = compiler.compile_incremental(_PROJECT_FILES)
         stats1 = compiler.get_stats()
         
-        result2 = compiler.compile_incremental(files)
+        result2 = compiler.compile_incremental(_PROJECT_FILES)
         stats2 = compiler.get_stats()
         
         # After second compile with no changes, should have more cache hits
@@ -325,7 +337,7 @@ print(z)
 class TestIntegration:
     """Integration tests for Phase 14"""
     
-    def test_full_pipeline(self):
+    def test_full_pipeline(self, compiler):
         """Test full compilation pipeline"""
         code = '''
 def square(x) {
@@ -336,8 +348,6 @@ let result = square(5)
 print(result)
 '''
         
-        compiler = SelfHostedCompiler()
-        
         # Compile to AST
         ast = compiler.compile_to_ast(code)
         assert len(ast.statements) > 0
@@ -350,7 +360,7 @@ print(result)
         bytecode = compiler.compile_to_bytecode(code)
         assert len(bytecode) > 0
     
-    def test_optimizer_integration(self):
+    def test_optimizer_integration(self, compiler):
         """Test optimizer with other components"""
         code = 'let x = 10\nlet y = 20\nlet z = x + y\nprint(z)'
         
@@ -360,7 +370,6 @@ print(result)
         # Check that optimization preserves key elements
         assert 'x' in optimized or 'z' in optimized or len(optimized) > 0
         
-        compiler = SelfHostedCompiler()
         ast = compiler.compile_to_ast(code)  # Parse original
         assert len(ast.statements) > 0
 
@@ -141,6 +141,33 @@ class TestAutoCompleter:
         assert "xx" in suggestions
         assert "xxx" in suggestions
     
+    def test_update_context_drops_old_locals(self):
+        """Replacing the context should forget variables no longer in it."""
+        self.completer.update_context({"counter": int, "sum": int})
+        self.completer.update_context({"total": int})
+        assert self.completer.get_suggestions("coun") == []
+        assert "total" in self.completer.get_suggestions("to")
+        # A local that shadowed a builtin leaves the builtin in place
+        assert self.completer.get_suggestions("sum") == ["sum"]
+
+    def test_suggestions_limited_in_order(self):
+        """Truncation should keep the shortest names in alphabetical order."""
+        self.completer.update_context({f"v{i}": int for i in range(30)})
+        suggestions = self.completer.get_suggestions("v")
+        assert suggestions == sorted(
+            [f"v{i}" for i in range(30)], key=lambda s: (len(s), s)
+        )[:10]
+
+    def test_cached_suggestions_follow_context(self):
+        """Repeated lookups are cached until the context changes."""
+        self.completer.update_context({"var_a": int})
+        first = self.completer.get_suggestions("var")
+        first.append("mutated")
+        assert self.completer.get_suggestions("var") == ["var_a"]
+
+        self.completer.update_context({"var_b": int})
+        assert self.completer.get_suggestions("var") == ["var_b"]
+
     def test_max_suggestions(self):
         """Should limit suggestions to 10."""
         # This test may be skipped if there aren't 11+ matching completions
@@ -240,6 +267,24 @@ class TestMultiLineBuffer:
         self.buffer.add_line("{ x = 1 }")
         assert self.buffer.is_complete()
 
+    def test_trailing_blank_line_keeps_operator_ending(self):
+        """A blank line should not hide an operator ending the previous line."""
+        self.buffer.add_line("let x = 1 +")
+        assert not self.buffer.add_line("   ")
+
+    def test_brackets_in_strings_ignored(self):
+        """Brackets inside string literals should not be counted."""
+        assert self.buffer.add_line('print("(" + \'[{\')')
+        assert self.buffer.open_parens == 0
+        assert self.buffer.open_brackets == 0
+        assert self.buffer.open_braces == 0
+
+    def test_brackets_in_comments_ignored(self):
+        """Brackets after a comment marker should not be counted."""
+        assert not self.buffer.add_line("let f = (1 # close it with )")
+        assert self.buffer.open_parens == 1
+        assert self.buffer.add_line(")")
+
 
 class TestSynapseREPL:
     """Test REPL integration."""
@@ -383,6 +428,20 @@ class TestEdgeCases:
         result = highlighter.colorize('"test@#$%^&*()"')
         assert "@" in result or Colors.RESET in result  # Properly escaped or reset
     
+    def test_hash_inside_string_is_not_comment(self):
+        """A '#' inside a string literal should not start a comment."""
+        highlighter = SyntaxHighlighter()
+        result = highlighter.colorize('"a # b" + 1')
+        assert Colors.GREEN + '"a # b"' + Colors.RESET in result
+        assert Colors.BRIGHT_BLACK not in result
+
+    def test_comment_ends_at_newline(self):
+        """Code on the line after a comment should still be highlighted."""
+        highlighter = SyntaxHighlighter()
+        result = highlighter.colorize("x # note\nlet y = 1")
+        assert Colors.BRIGHT_BLACK + "# note" + Colors.RESET in result
+        assert Colors.MAGENTA + Colors.BOLD + "let" + Colors.RESET in result
+
     def test_unicode_characters(self):
         """Unicode should be handled gracefully."""
         highlighter = SyntaxHighlighter()
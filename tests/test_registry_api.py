@@ -22,6 +22,9 @@ from models import User, Package, PackageVersion
 from auth import hash_password, generate_token
 from storage import create_package_tarball
 
+# The app's database is shared by every test here; keep them on one worker
+pytestmark = pytest.mark.xdist_group("registry_db")
+
 
 @pytest.fixture
 def client():
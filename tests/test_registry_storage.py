@@ -0,0 +1,171 @@
+"""
+Tests for the Synapse Registry storage helpers
+"""
+
+import gzip
+import io
+import json
+import sys
+import tarfile
+from pathlib import Path
+
+import pytest
+
+# Add synapse-registry to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'synapse-registry'))
+
+import storage
+from storage import (
+    LocalStorage,
+    PackageIndex,
+    extract_package_manifest,
+    validate_package_tarball,
+    verify_gzip_crc,
+)
+
+MANIFEST = {
+    'name': 'test-pkg',
+    'version': '1.0.0',
+    'description': 'Pakét for tests',
+}
+
+
+def make_tarball(manifest=MANIFEST, manifest_bytes=None):
+    """Build a gzipped package tarball containing synapse.json"""
+    if manifest_bytes is None:
+        manifest_bytes = json.dumps(manifest).encode()
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode='w:gz') as tar:
+        info = tarfile.TarInfo('test-pkg/synapse.json')
+        info.size = len(manifest_bytes)
+        tar.addfile(info, io.BytesIO(manifest_bytes))
+    return buf.getvalue()
+
+
+class TestLocalStorage:
+    """Test LocalStorage file handling"""
+    
+    def test_save_load_round_trip(self, tmp_path):
+        storage = LocalStorage(str(tmp_path))
+        data = make_tarball()
+        path = storage.save_tarball('test-pkg', '1.0.0', data)
+        assert storage.exists(path)
+        assert storage.load_tarball(path) == data
+
+
+class TestManifest:
+    """Test manifest parsing"""
+    
+    def test_extract_manifest(self):
+        assert extract_package_manifest(make_tarball()) == MANIFEST
+    
+    def test_validate_accepts_package(self):
+        validate_package_tarball(make_tarball())
+    
+    def test_validate_missing_field(self):
+        manifest = {k: v for k, v in MANIFEST.items() if k != 'description'}
+        with pytest.raises(ValueError) as exc_info:
+            validate_package_tarball(make_tarball(manifest))
+        assert 'description' in str(exc_info.value)
+    
+    def test_validate_malformed_manifest(self):
+        with pytest.raises(ValueError):
+            validate_package_tarball(make_tarball(manifest_bytes=b'{"name":'))
+
+
+class TestGzipCrc:
+    """Test gzip trailer verification"""
+    
+    PAYLOAD = b'synapse' * 1000
+    
+    def test_good_crc(self):
+        verify_gzip_crc(gzip.compress(self.PAYLOAD))
+        verify_gzip_crc(make_tarball())
+    
+    def test_corrupted_trailer(self):
+        data = bytearray(gzip.compress(self.PAYLOAD))
+        data[-8] ^= 0xFF
+        with pytest.raises(ValueError) as exc_info:
+            verify_gzip_crc(bytes(data))
+        assert 'CRC' in str(exc_info.value)
+    
+    @pytest.mark.parametrize('cut', [4, 8, 20])
+    def test_truncated_stream(self, cut):
+        data = gzip.compress(self.PAYLOAD)
+        with pytest.raises(ValueError) as exc_info:
+            verify_gzip_crc(data[:-cut])
+        assert 'truncated' in str(exc_info.value)
+    
+    def test_oversized_stream(self):
+        # 1 MiB of zeros compresses to about 1 KB
+        data = gzip.compress(bytes(1024 * 1024))
+        with pytest.raises(ValueError) as exc_info:
+            verify_gzip_crc(data, max_size=64 * 1024)
+        assert 'exceeds' in str(exc_info.value)
+    
+    def test_size_checked_before_decompressing(self, monkeypatch):
+        def fail(data):
+            raise AssertionError('decompressed an oversized upload')
+        
+        monkeypatch.setattr(storage, '_MAX_TARBALL_SIZE', 16)
+        monkeypatch.setattr(storage, 'verify_gzip_crc', fail)
+        with pytest.raises(ValueError) as exc_info:
+            validate_package_tarball(make_tarball())
+        assert 'maximum size' in str(exc_info.value)
+
+
+class TestPackageIndex:
+    """Test PackageIndex ordering and persistence"""
+    
+    def test_add_package_keeps_newest_first(self):
+        index = PackageIndex()
+        for version in ['1.1.0', '1.0.0', '2.0.0', '1.5.0']:
+            index.add_package('test-pkg', version, {})
+        assert index.list_versions('test-pkg') == ['2.0.0', '1.5.0', '1.1.0', '1.0.0']
+        assert index.get_latest_version('test-pkg') == '2.0.0'
+    
+    def test_add_package_ignores_duplicates(self):
+        index = PackageIndex()
+        for version in ['1.0.0', '2.0.0', '1.0.0', '2.0.0']:
+            index.add_package('test-pkg', version, {})
+        assert index.list_versions('test-pkg') == ['2.0.0', '1.0.0']
+    
+    def test_add_versions_merges(self):
+        index = PackageIndex()
+        index.add_package('test-pkg', '1.5.0', {'description': 'first'})
+        index.add_versions('test-pkg', ['1.0.0', '2.0.0', '1.5.0'], {'description': 'second'})
+        assert index.list_versions('test-pkg') == ['2.0.0', '1.5.0', '1.0.0']
+        assert index.packages['test-pkg']['metadata'] == {'description': 'first'}
+    
+    def test_add_versions_new_package(self):
+        index = PackageIndex()
+        index.add_versions('test-pkg', ['1.0.0', '3.0.0', '2.0.0'], {})
+        assert index.has_version('test-pkg', '3.0.0')
+        assert index.list_versions('test-pkg') == ['3.0.0', '2.0.0', '1.0.0']
+    
+    def test_load_sorts_versions(self, tmp_path):
+        path = tmp_path / 'index.json'
+        path.write_text(json.dumps({
+            'test-pkg': {'versions': ['1.0.0', '2.0.0', '1.5.0'], 'metadata': {}}
+        }))
+        index = PackageIndex()
+        index.load(str(path))
+        assert index.list_versions('test-pkg') == ['2.0.0', '1.5.0', '1.0.0']
+
+    def test_load_entry_without_versions(self, tmp_path):
+        path = tmp_path / 'index.json'
+        path.write_text(json.dumps({'test-pkg': {'metadata': {}}}))
+        index = PackageIndex()
+        index.load(str(path))
+        assert index.list_versions('test-pkg') == []
+
+    def test_save_load_round_trip(self, tmp_path):
+        index = PackageIndex()
+        index.add_package('test-pkg', '1.0.0', {'description': 'Pakét'})
+        index.save(str(tmp_path / 'index.json'))
+        # Raw UTF-8 whether or not orjson is installed
+        assert 'Pakét'.encode() in (tmp_path / 'index.json').read_bytes()
+        
+        loaded = PackageIndex()
+        loaded.load(str(tmp_path / 'index.json'))
+        assert loaded.packages == index.packages